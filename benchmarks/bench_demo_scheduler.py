@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Takt der Demo-Schleife
+Misst Drift und Jitter der Slide-Wechsel über viele Übergänge (Termine vs. Polling)
+Drift entsteht beim Termin-Takt nur durch Hänger über eine Slide-Dauer (Spalte "Neu ausger.")
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.demo import DemoService
+
+
+class SchedulerOnly(DemoService):
+    """DemoService ohne Hardware-Signale - misst nur den Takt"""
+
+    def _send_slide_signal(self, slide_id):
+        pass
+
+
+def run_deadline(transitions, duration):
+    """Wechselzeitpunkte des DemoService (absolute monotonic-Termine)"""
+    service = SchedulerOnly()
+    times = []
+    done = threading.Event()
+
+    def on_slide(slide_id):
+        times.append(time.monotonic())
+        if len(times) > transitions:
+            done.set()
+
+    service.add_callback(on_slide)
+    service.loop_demo = True
+    if not service.start_demo():
+        raise RuntimeError("Keine Slides vorhanden")
+    service.slide_duration = duration  # Setter begrenzt auf 1 s, hier direkt setzen
+    service._wakeup.set()
+    done.wait()
+    service.stop_demo()
+    return times[1:transitions + 2], service.realignments
+
+
+def run_polling(transitions, duration, poll):
+    """Nachbau der früheren Schleife: relativer Start je Slide, Prüfung alle ``poll`` Sekunden"""
+    times = []
+    while len(times) <= transitions:
+        times.append(time.monotonic())
+        start_time = time.time()
+        while (time.time() - start_time) < duration:
+            time.sleep(poll)
+    return times, None
+
+
+def report(label, times, duration, cpu, realignments):
+    """Gibt Drift, Verspätung je Wechsel, Intervall-Jitter und Neuausrichtungen aus"""
+    start = times[0]
+    lateness = sorted(t - (start + i * duration) for i, t in enumerate(times))
+    jitter = sorted(abs((b - a) - duration) for a, b in zip(times, times[1:]))
+    drift = times[-1] - (start + (len(times) - 1) * duration)
+    p99 = jitter[int(len(jitter) * 0.99) - 1]
+    print(f"{label:<10} {drift * 1000:>10.2f} ms {statistics.median(lateness) * 1000:>9.3f} ms "
+          f"{lateness[-1] * 1000:>9.3f} ms {statistics.median(jitter) * 1000:>8.3f} ms "
+          f"{p99 * 1000:>8.3f} ms {cpu * 1000:>8.0f} ms {'-' if realignments is None else realignments:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Drift- und Jitter-Benchmark der Demo-Schleife')
+    parser.add_argument('--transitions', type=int, default=10000, help='Anzahl Slide-Wechsel')
+    parser.add_argument('--duration', type=float, default=0.002, help='Slide-Dauer in Sekunden')
+    parser.add_argument('--poll', type=float, default=0.001,
+                        help='Polling-Intervall der alten Schleife (dort 0.1 s bei >= 1 s Slides)')
+    parser.add_argument('--skip-polling', action='store_true', help='Nur den neuen Takt messen')
+    args = parser.parse_args()
+
+    print(f"{args.transitions} Wechsel à {args.duration * 1000:.1f} ms")
+    print(f"{'Modus':<10} {'Drift':>13} {'Verz. p50':>12} {'Verz. max':>12} "
+          f"{'Jitter p50':>11} {'Jitter p99':>11} {'CPU':>11} {'Neu ausger.':>11}")
+
+    cpu_start = time.process_time()
+    times, realignments = run_deadline(args.transitions, args.duration)
+    report('termine', times, args.duration, time.process_time() - cpu_start, realignments)
+
+    if not args.skip_polling:
+        cpu_start = time.process_time()
+        times, realignments = run_polling(args.transitions, args.duration, args.poll)
+        report('polling', times, args.duration, time.process_time() - cpu_start, realignments)
+
+
+if __name__ == "__main__":
+    main()
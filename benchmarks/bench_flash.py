@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Firmware-Flash nacheinander vs. parallel
+Flasht virtuelle ESP32 mit simuliertem Bootloader und misst Dauer und Durchsatz
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import config
+from models.hardware import HardwareManager
+from services.simulator import HardwareSimulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Firmware-Flash-Benchmark mit virtuellen Boards')
+    parser.add_argument('--boards', type=int, default=3, help='Anzahl virtueller ESP32')
+    parser.add_argument('--size', type=int, default=512, help='Image-Größe in KiB')
+    parser.add_argument('--flash-delay', type=float, default=0.002, help='Schreibzeit je Block in Sekunden')
+    parser.add_argument('--corrupt-rate', type=float, default=0.005, help='Anteil fehlerhafter Blöcke')
+    parser.add_argument('--window', type=int, default=config.hardware['flash_window'],
+                        help='Unquittierte Blöcke gleichzeitig')
+    args = parser.parse_args()
+    config.hardware['flash_window'] = args.window
+
+    with tempfile.NamedTemporaryFile(suffix='.bin', delete=False) as firmware:
+        firmware.write(os.urandom(args.size * 1024))
+    simulator = HardwareSimulator()
+    for instance_number in range(1, args.boards + 1):
+        simulator.add_esp32(instance_number, flash_delay=args.flash_delay,
+                            flash_corrupt_rate=args.corrupt_rate)
+    simulator.start()
+
+    manager = HardwareManager()
+    simulator.attach(manager)
+    try:
+        manager.connect_all(deadline=5)
+
+        started = time.monotonic()
+        for connection in manager.connections.values():
+            connection.flash_firmware(firmware.name)
+        sequential = time.monotonic() - started
+        print(f"Nacheinander: {sequential:.2f}s für {args.boards} x {args.size} KiB")
+
+        started = time.monotonic()
+        reports = manager.flash_all(firmware.name)
+        parallel = time.monotonic() - started
+        print(f"Parallel:     {parallel:.2f}s (Faktor {sequential / parallel:.1f})")
+        for name, report in reports.items():
+            print(f"  {name}: {report['state']}, {report['throughput'] / 1024:.0f} KiB/s, "
+                  f"{report['retransmits']} Wiederholungen, {report['attempts']} Versuch(e)")
+    finally:
+        manager.disconnect_all()
+        simulator.stop()
+        os.unlink(firmware.name)
+
+
+if __name__ == "__main__":
+    main()
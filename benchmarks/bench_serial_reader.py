@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Lese-Schleifen von HardwareConnection
+Vergleicht 10-ms-Polling mit dem ereignisgesteuerten Reader auf einem pty
+"""
+
+import os
+import sys
+import time
+import tty
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.hardware import HardwareConnection
+
+
+def open_fake_port():
+    """Erzeugt ein pty-Paar und liefert (master_fd, slave_fd, Portpfad)"""
+    master_fd, slave_fd = os.openpty()
+    tty.setraw(slave_fd)
+    return master_fd, slave_fd, os.ttyname(slave_fd)
+
+
+def run_mode(read_mode, idle_seconds, messages):
+    """Misst Leerlauf-CPU und Zeilen-Latenz für einen Reader-Modus"""
+    master_fd, slave_fd, port = open_fake_port()
+    connection = HardwareConnection(port, f"bench-{read_mode}", read_mode=read_mode)
+    try:
+        if not connection.connect():
+            raise RuntimeError(f"Fake-Port {port} konnte nicht geöffnet werden")
+        connection.start_reading()
+
+        # Leerlauf: nur der Reader-Thread läuft, der Haupt-Thread schläft
+        cpu_start = time.process_time()
+        time.sleep(idle_seconds)
+        idle_cpu = time.process_time() - cpu_start
+
+        # Latenz: Zeit vom write() auf dem Master bis zum Eintrag in der Queue
+        latencies = []
+        for i in range(messages):
+            sent = time.perf_counter()
+            os.write(master_fd, f"TELEMETRY:{i}\n".encode('ascii'))
+            connection.data_queue.get(timeout=2)
+            latencies.append(time.perf_counter() - sent)
+            time.sleep(0.002)
+
+        return idle_cpu, latencies
+    finally:
+        connection.disconnect()
+        os.close(master_fd)
+        os.close(slave_fd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark der Serial-Reader-Modi')
+    parser.add_argument('--idle', type=float, default=3.0, help='Leerlaufdauer in Sekunden')
+    parser.add_argument('--messages', type=int, default=500, help='Anzahl Latenz-Messungen')
+    args = parser.parse_args()
+
+    print(f"{'Modus':<8} {'Idle-CPU':>12} {'p50':>10} {'p95':>10} {'max':>10}")
+    for mode in ('poll', 'event'):
+        idle_cpu, latencies = run_mode(mode, args.idle, args.messages)
+        latencies.sort()
+        p50 = statistics.median(latencies)
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(f"{mode:<8} {idle_cpu * 1000 / args.idle:>8.2f} ms/s "
+              f"{p50 * 1000:>7.3f} ms {p95 * 1000:>7.3f} ms {latencies[-1] * 1000:>7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
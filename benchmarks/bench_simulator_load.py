@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Lasttest: HardwareManager gegen virtuelle ESP32/GIGA-Boards
+Misst Telemetrie-Durchsatz und Befehlsrate ohne echte Hardware
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.hardware import HardwareManager
+from services.simulator import HardwareSimulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lasttest mit virtuellen Boards')
+    parser.add_argument('--boards', type=int, default=3, help='Anzahl virtueller ESP32')
+    parser.add_argument('--rate', type=float, default=1000, help='Telemetrie-Zeilen/s je Board')
+    parser.add_argument('--commands', type=int, default=5000, help='SIGNAL-Befehle je Board')
+    parser.add_argument('--duration', type=float, default=3.0, help='Messdauer Telemetrie in Sekunden')
+    parser.add_argument('--latency', type=float, default=0.0, help='Antwortlatenz der Boards in Sekunden')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Jitter der Antwortlatenz in Sekunden')
+    parser.add_argument('--io-engine', action='store_true', help='Gemeinsame I/O-Engine statt Reader-Threads')
+    args = parser.parse_args()
+
+    simulator = HardwareSimulator()
+    for instance_number in range(1, args.boards + 1):
+        simulator.add_esp32(instance_number, telemetry_rate=args.rate,
+                            latency=args.latency, jitter=args.jitter)
+    simulator.add_giga(latency=args.latency, jitter=args.jitter)
+    simulator.start()
+
+    manager = HardwareManager(use_io_engine=args.io_engine)
+    simulator.attach(manager)
+    try:
+        results = manager.connect_all(deadline=5)
+        print(f"Verbunden: {sum(bool(ok) for ok in results.values())}/{len(results)}, "
+              f"Threads: {threading.active_count()}")
+
+        # Telemetrie-Durchsatz
+        manager.get_all_data()
+        cpu_start = time.process_time()
+        started = time.monotonic()
+        received = 0
+        while time.monotonic() - started < args.duration:
+            time.sleep(0.05)
+            received += len(manager.get_all_data())
+        elapsed = time.monotonic() - started
+        print(f"Telemetrie: {received / elapsed:,.0f} Zeilen/s "
+              f"(Soll {args.rate * args.boards:,.0f}), CPU {time.process_time() - cpu_start:.2f}s")
+
+        # Befehlsrate über die Writer-Threads
+        esp32s = [connection for name, connection in manager.connections.items() if name.startswith('esp32_')]
+        started = time.monotonic()
+        futures = [
+            connection.send_signal(f"page_{i % 10 + 1}", block=False)
+            for i in range(args.commands)
+            for connection in esp32s
+        ]
+        for future in futures:
+            future.result(timeout=10)
+        elapsed = time.monotonic() - started
+        print(f"Befehle: {len(futures) / elapsed:,.0f} SIGNAL/s über {len(esp32s)} Boards")
+
+        queue_stats = manager.get_queue_stats()
+        dropped = sum(stats['dropped'] for stats in queue_stats.values())
+        sim_stats = simulator.get_stats().values()
+        print(f"Queue-Verluste: {dropped}, "
+              f"Befehle bei Boards angekommen: {sum(stats['commands_received'] for stats in sim_stats)}")
+    finally:
+        manager.disconnect_all()
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -21,7 +21,58 @@ class Config:
             'esp32_3_port': '/dev/ttyUSB2',  # ESP32.3 (Addon)
             'giga_port': '/dev/ttyACM0',     # Arduino GIGA
             'baud_rate': 115200,
-            'timeout': 1
+            'timeout': 1,
+            'read_mode': 'event',     # 'event' (select auf fd) oder 'poll' (10-ms-Polling)
+            'select_timeout': 0.25,   # Sekunden, bis ein Reader running=False bemerkt
+            'io_engine': False,       # True: ein selectors-Thread für alle Ports
+            'connect_deadline': 2.0,  # Sekunden bis connect_all den Start freigibt
+            'queue_capacity': 4096,   # Einträge je Daten-Ring-Puffer
+            'queue_policy': 'drop_oldest',  # oder 'drop_newest'
+            'write_timeout': 2.0,     # Sekunden, die send_data auf den Writer wartet
+            'tx_rate': 0,             # Max. Bytes/s je Gerät (0 = unbegrenzt, 115200 Baud ≈ 11520)
+            'tx_burst': 256,          # Bytes, die ohne Drosselung am Stück gesendet werden (UART-Puffer)
+            'broadcast_deadline': 0.5,  # Sekunden, die ein Broadcast auf alle Geräte wartet
+            'protocol': 'auto',       # 'auto' (beim Verbinden aushandeln), 'text' oder 'binary'
+            'handshake_timeout': 0.3,  # Sekunden je Handshake-Antwort beim Verbinden
+            'baud_rates': [921600, 460800, 230400],  # Kandidaten über baud_rate, höchste zuerst ([] = fest)
+            'baud_settle': 0.02,      # Sekunden nach dem Umstellen, bevor das Testmuster läuft
+            'baud_confirm_timeout': 0.5,  # So lange wartet das Board auf BAUD_TEST, bevor es zurückfällt
+            'baud_retry_after': 300.0,  # Sekunden, bis eine fehlgeschlagene Rate erneut versucht wird
+            'supervisor': True,       # Abgerissene Verbindungen automatisch neu aufbauen
+            'supervisor_interval': 0.5,    # Sekunden zwischen zwei Prüfungen
+            'reconnect_base_delay': 0.5,   # Sekunden vor dem zweiten Versuch (verdoppelt sich)
+            'reconnect_max_delay': 30.0,   # Obergrenze des Backoffs in Sekunden
+            'command_ack': False,     # SIGNAL-Befehle mit Sequenznummer und ACK senden
+            'ack_timeout': 1.0,       # Sekunden, nach denen eine Quittung als verloren gilt
+            'heartbeat_interval': 1.0,  # Sekunden zwischen PINGs (0 = aus)
+            'heartbeat_miss_limit': 3,  # Ausbleibende PONGs, ab denen ein Board als hängend gilt
+            'clock_sync': True,       # Board-Uhren beim Verbinden per TSYNC abgleichen
+            'clock_sync_samples': 8,  # Messungen je Abgleich (die schnellste zählt)
+            'clock_sync_interval': 10.0,  # Sekunden zwischen Nachmessungen (0 = aus)
+            'schedule_lead': 0.05,    # Sekunden Vorlauf für zeitgesteuerte Befehle
+            'stream_fps': 30,         # Bildrate des LED-Frame-Streams
+            'stream_frame_size': 180,  # Bytes je Frame (60 RGB-LEDs)
+            'telemetry_capacity': 3600,  # Sensorwerte je Reihe im Spaltenpuffer
+            'udp_mode': 'giga',       # 'giga' (UDP über GIGA-UART) oder 'host' (direkt vom Host)
+            'udp_targets': ['192.168.1.100:5005'],  # Empfänger der Slide-Signale
+            'udp_port': 5005,         # Standard-Port für Ziele ohne Portangabe
+            'udp_multicast': None,    # z.B. '239.0.0.42:5005' statt einzelner Ziele
+            'udp_tick': 0.005,        # Sekunden, in denen Signale je Ziel gebündelt werden
+            'udp_reply_port': 0,      # Lokaler Port für Antworten (0 = beliebig)
+            'flash_chunk_size': 1024,  # Bytes je Firmware-Block (CRC32 je Block)
+            'flash_window': 8,        # Unquittierte Blöcke, die gleichzeitig unterwegs sind
+            'flash_chunk_timeout': 2.0,  # Sekunden ohne Antwort, bis ein Versuch neu beginnt
+            'flash_attempts': 5,      # Versuche je Board inkl. Wiederaufnahme
+            'flash_reconnect_wait': 10.0,  # Sekunden Warten auf Reconnect zwischen zwei Versuchen
+            'discovery': True,        # Ports per VID/PID erkennen statt feste Pfade
+            'discovery_rules': {      # (VID, PID) je Board-Typ
+                'esp32': [(0x10C4, 0xEA60), (0x1A86, 0x7523), (0x303A, 0x1001)],  # CP210x, CH340, ESP32-S3 USB
+                'giga': [(0x2341, 0x0266), (0x2341, 0x0366)]   # Arduino GIGA R1 (Sketch/Bootloader)
+            },
+            'device_serials': {},     # Feste Zuordnung, z.B. {'esp32_1': '0001A2B3'}
+            'discovery_interval': 1.0,  # Sekunden zwischen zwei Prüfungen von /dev
+            'device_registry': os.path.join(self.base_dir, "data", "devices.json"),  # Geräte und Gruppen
+            'slide_group': 'esp32'    # Gruppe, die Slide-Signale erhält
         }
         
         # GUI-Konfiguration
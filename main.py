@@ -11,27 +11,45 @@ sys.path.insert(0, os.path.dirname(__file__))
 from core.logger import logger
 from core.config import config
 from models.hardware import hardware_manager
+from services.udp import udp_transport
+from services.discovery import port_discovery
 
-def setup_hardware():
-    """Initialisiert Hardware-Verbindungen"""
+def setup_hardware(simulator=None):
+    """Initialisiert Hardware-Verbindungen (optional gegen virtuelle Boards)"""
     logger.info("🔌 Hardware-Setup wird gestartet...")
     
     try:
-        # ESP32-Verbindungen hinzufügen
-        esp32_1 = hardware_manager.add_esp32(config.hardware['esp32_1_port'], 1)
-        esp32_2 = hardware_manager.add_esp32(config.hardware['esp32_2_port'], 2)
-        esp32_3 = hardware_manager.add_esp32(config.hardware['esp32_3_port'], 3)
+        # Geräte und Gruppen aus data/devices.json (sonst feste Standard-Verdrahtung)
+        hardware_manager.load_registry()
         
-        # Arduino GIGA hinzufügen
-        giga = hardware_manager.add_giga(config.hardware['giga_port'])
+        if simulator:
+            # Virtuelle Boards auf Pseudo-Terminals statt echter Ports
+            simulator.attach(hardware_manager)
+        elif config.hardware['discovery']:
+            # Boards über VID/PID bzw. Seriennummer finden, Hot-Plug überwachen
+            port_discovery.attach(hardware_manager)
+            port_discovery.start_watching()
+        else:
+            # ESP32- und GIGA-Verbindungen mit den Ports aus der Registry
+            hardware_manager.add_registry_devices()
         
-        # Verbindungen herstellen
-        results = hardware_manager.connect_all()
+        # Verbindungen parallel herstellen (Nachzügler verbinden im Hintergrund)
+        results, timings = hardware_manager.connect_all(
+            deadline=config.hardware['connect_deadline'],
+            return_timings=True
+        )
         
         # Ergebnisse loggen
         for device, success in results.items():
+            if success is None:
+                logger.info(f"{device}: ⏳ Verbindet im Hintergrund")
+                continue
             status = "✅ Verbunden" if success else "❌ Fehler"
-            logger.info(f"{device}: {status}")
+            logger.info(f"{device}: {status} ({timings[device]:.2f}s)")
+        
+        # Abgerissene oder fehlende Verbindungen automatisch neu aufbauen
+        if config.hardware['supervisor']:
+            hardware_manager.start_supervisor()
         
         return any(results.values())  # True wenn mindestens eine Verbindung erfolgreich
         
@@ -98,6 +116,8 @@ def main():
     parser.add_argument('--no-hardware', action='store_true', help='Ohne Hardware-Verbindungen starten')
     parser.add_argument('--debug', action='store_true', help='Debug-Modus aktivieren')
     parser.add_argument('--text-mode', action='store_true', help='Textmodus ohne GUI starten')
+    parser.add_argument('--simulate', action='store_true', help='Virtuelle ESP32/GIGA-Boards statt echter Ports')
+    parser.add_argument('--record', metavar='DATEI', help='Seriellen Verkehr in eine Aufnahme-Datei schreiben')
     
     args = parser.parse_args()
     
@@ -110,10 +130,26 @@ def main():
     logger.info(f"Python Version: {sys.version}")
     logger.info(f"Arbeitsverzeichnis: {os.getcwd()}")
     
+    simulator = None
     try:
         # Hardware-Setup (falls gewünscht)
+        if args.simulate and not args.no_hardware:
+            from services.simulator import HardwareSimulator
+            from models.registry import DeviceRegistry
+            simulator = HardwareSimulator()
+            registry = DeviceRegistry.load()
+            for name in registry.names_of_type('esp32'):
+                simulator.add_esp32(name=name)
+            for name in registry.names_of_type('giga'):
+                simulator.add_giga(name)
+            simulator.start()
+            logger.info("🧪 Hardware-Simulator aktiv")
+        
+        if args.record and not args.no_hardware:
+            hardware_manager.start_recording(args.record)
+        
         if not args.no_hardware:
-            hardware_success = setup_hardware()
+            hardware_success = setup_hardware(simulator)
             if not hardware_success:
                 logger.warning("⚠️ Keine Hardware-Verbindungen erfolgreich - Anwendung startet trotzdem")
         else:
@@ -134,7 +170,11 @@ def main():
     finally:
         # Cleanup
         logger.info("🧹 Cleanup wird durchgeführt...")
+        port_discovery.stop_watching()
         hardware_manager.disconnect_all()
+        udp_transport.stop()
+        if simulator:
+            simulator.stop()
         logger.info("👋 Dynamic Messe Stand V4 beendet")
 
 if __name__ == "__main__":
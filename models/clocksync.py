@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Uhren-Abgleich für Dynamic Messe Stand V4
+NTP-artige Schätzung des Offsets zwischen Host- und Board-Uhr über die serielle Leitung
+"""
+
+import threading
+import time
+from collections import deque
+
+def host_us(now=None):
+    """Host-Zeit in Mikrosekunden (time.monotonic als Basis)"""
+    return int((time.monotonic() if now is None else now) * 1_000_000)
+
+class ClockOffsetEstimator:
+    """Schätzt ``board_us - host_us`` aus TSYNC-Austauschen
+
+    Je Austausch: t1 Host sendet, t2 Board empfängt, t3 Board antwortet,
+    t4 Host empfängt. Offset = ((t2 - t1) + (t3 - t4)) / 2, Laufzeit =
+    (t4 - t1) - (t3 - t2). Wie beim NTP-Clock-Filter zählt von den letzten
+    ``window`` Messungen die mit der kürzesten Laufzeit; deren Fehler ist
+    höchstens die halbe Asymmetrie dieser einen Messung.
+    """
+
+    def __init__(self, window=8):
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.offset_us = None
+        self.delay_us = None
+        self.updated = None
+
+    def add_sample(self, t1, t2, t3, t4):
+        """Nimmt einen Austausch auf und liefert den aktuellen Offset"""
+        offset = ((t2 - t1) + (t3 - t4)) / 2
+        delay = (t4 - t1) - (t3 - t2)
+        with self._lock:
+            self.samples.append((delay, offset))
+            self.delay_us, offset = min(self.samples)
+            self.offset_us = int(round(offset))
+            self.updated = time.monotonic()
+            return self.offset_us
+
+    @property
+    def synced(self):
+        return self.offset_us is not None
+
+    def to_board(self, host_time_us):
+        """Rechnet eine Host-Zeit (µs) in Board-Zeit um"""
+        if self.offset_us is None:
+            raise ValueError("Uhr noch nicht abgeglichen")
+        return host_time_us + self.offset_us
+
+    def reset(self):
+        with self._lock:
+            self.samples.clear()
+            self.offset_us = None
+            self.delay_us = None
+            self.updated = None
+
+    def get_stats(self):
+        return {
+            'offset_us': self.offset_us,
+            'delay_us': round(self.delay_us) if self.delay_us is not None else None,
+            'samples': len(self.samples),
+            'age': round(time.monotonic() - self.updated, 3) if self.updated else None
+        }
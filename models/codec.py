@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Protokoll-Codecs für Dynamic Messe Stand V4
+Text-Protokoll (Standard) und kompaktes binäres Frame-Format für ESP32/GIGA
+"""
+
+import socket
+import struct
+
+class ProtocolError(ValueError):
+    """Fehlerhafter oder unbekannter Frame"""
+
+class TextCodec:
+    """Bisheriges ASCII-Protokoll: ``SIGNAL:page_3:1\\n`` bzw. ``SIGNAL:page_3:1#17\\n`` mit Sequenznummer"""
+
+    name = 'text'
+
+    def encode(self, command, *args, seq=None):
+        text = ':'.join([command, *(str(arg) for arg in args)])
+        if seq is not None:
+            text += f"#{seq}"
+        return (text + '\n').encode('utf-8')
+
+# Opcode und Argument-Format je Befehl: s = Text (u8-Länge + UTF-8), i = int16, q = int64, a = IPv4
+COMMANDS = {
+    'SIGNAL': (0x01, 'si'),
+    'UDP_SEND': (0x02, 'asi'),
+    'UDP_ENABLE': (0x03, ''),
+    'UDP_DISABLE': (0x04, ''),
+    'PING': (0x05, 'i'),
+    'SIGNAL_AT': (0x06, 'qsi'),  # Ausführung zur Board-Zeit (µs)
+    'TSYNC': (0x07, 'iq'),       # Uhren-Abgleich: Seq, Host-Sendezeit (µs)
+}
+OPCODES = {opcode: (command, fmt) for command, (opcode, fmt) in COMMANDS.items()}
+
+def crc16_ccitt(data, crc=0xFFFF):
+    """CRC-16/CCITT-FALSE, auf Mikrocontrollern mit wenigen Zeilen nachrechenbar"""
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+            crc &= 0xFFFF
+    return crc
+
+class BinaryCodec:
+    """Längenpräfixierte Frames mit CRC
+
+    Aufbau: ``0xA5 | Länge (u8) | Opcode (u8) | [Seq (u16)] | Payload | CRC16 (u16, LE)``.
+    Die Länge zählt Opcode, Seq und Payload; die CRC läuft über Länge und Rumpf.
+    Ist Bit 7 des Opcodes gesetzt, folgt eine Sequenznummer für die Quittung.
+    """
+
+    name = 'binary'
+    SYNC = 0xA5
+    MAX_BODY = 255
+    SEQ_FLAG = 0x80
+
+    def encode(self, command, *args, seq=None):
+        try:
+            opcode, fmt = COMMANDS[command]
+        except KeyError:
+            raise ProtocolError(f"Befehl {command} hat keinen Binär-Opcode")
+        if len(args) != len(fmt):
+            raise ProtocolError(f"{command} erwartet {len(fmt)} Argumente, erhalten {len(args)}")
+
+        if seq is None:
+            body = bytearray((opcode,))
+        else:
+            body = bytearray((opcode | self.SEQ_FLAG,))
+            body += struct.pack('<H', seq & 0xFFFF)
+        for kind, arg in zip(fmt, args):
+            if kind == 's':
+                text = str(arg).encode('utf-8')
+                if len(text) > 255:
+                    raise ProtocolError(f"Argument zu lang für {command}: {arg!r}")
+                body.append(len(text))
+                body += text
+            elif kind == 'a':
+                try:
+                    body += socket.inet_aton(str(arg))
+                except OSError:
+                    raise ProtocolError(f"Keine IPv4-Adresse: {arg!r}")
+            elif kind == 'q':
+                body += struct.pack('<q', int(arg))
+            else:
+                try:
+                    body += struct.pack('<h', int(arg))
+                except struct.error:
+                    raise ProtocolError(f"Wert außerhalb int16 für {command}: {arg!r}")
+        if len(body) > self.MAX_BODY:
+            raise ProtocolError(f"Frame für {command} zu groß ({len(body)} Bytes)")
+
+        header = bytes((self.SYNC, len(body)))
+        crc = crc16_ccitt(body, crc16_ccitt(header[1:]))
+        return header + bytes(body) + struct.pack('<H', crc)
+
+    def decode(self, frame):
+        """Zerlegt einen vollständigen Frame in (Befehl, Argumente, Seq oder None)"""
+        if len(frame) < 5 or frame[0] != self.SYNC or frame[1] != len(frame) - 4:
+            raise ProtocolError("Ungültiger Frame-Kopf")
+        body = frame[2:-2]
+        (crc,) = struct.unpack('<H', frame[-2:])
+        if crc16_ccitt(body, crc16_ccitt(frame[1:2])) != crc:
+            raise ProtocolError("CRC-Fehler")
+        try:
+            command, fmt = OPCODES[body[0] & ~self.SEQ_FLAG]
+        except KeyError:
+            raise ProtocolError(f"Unbekannter Opcode 0x{body[0]:02x}")
+
+        seq = None
+        offset = 1
+        if body[0] & self.SEQ_FLAG:
+            (seq,) = struct.unpack_from('<H', body, 1)
+            offset = 3
+        args = []
+        for kind in fmt:
+            if kind == 's':
+                length = body[offset]
+                args.append(bytes(body[offset + 1:offset + 1 + length]).decode('utf-8'))
+                offset += 1 + length
+            elif kind == 'a':
+                args.append(socket.inet_ntoa(bytes(body[offset:offset + 4])))
+                offset += 4
+            elif kind == 'q':
+                args.append(struct.unpack_from('<q', body, offset)[0])
+                offset += 8
+            else:
+                args.append(struct.unpack_from('<h', body, offset)[0])
+                offset += 2
+        return command, args, seq
+
+CODECS = {
+    TextCodec.name: TextCodec,
+    BinaryCodec.name: BinaryCodec,
+}
+
+# Handshake beim Verbinden: Host fragt, Board bestätigt das Binärformat
+PROTOCOL_QUERY = "PROTO?:binary"
+PROTOCOL_ACCEPT = "PROTO:binary"
+
+# Baudraten-Aushandlung (Textzeilen, vor dem Start von Reader und Writer):
+#   BAUD?                -> BAUD:921600,460800,...   unterstützte Raten des Boards
+#   BAUD_SET:<rate>      -> BAUD_OK:<rate>           noch mit alter Rate, danach stellt das Board um
+#   BAUD_TEST:<muster>   -> BAUD_TEST:<muster>       Echo mit neuer Rate bestätigt den Wechsel
+# Ohne gültigen BAUD_TEST binnen baud_confirm_timeout kehrt das Board zur alten Rate zurück.
+BAUD_QUERY = "BAUD?"
+BAUD_SET = "BAUD_SET"
+BAUD_TEST = "BAUD_TEST"
+BAUD_PATTERN = "UUUU" + "".join(chr(c) for c in range(0x21, 0x7F) if chr(c) not in ':#')  # 0x55 + alle druckbaren Zeichen
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Event-Bus für Dynamic Messe Stand V4
+Publish/Subscribe für Hardware-Nachrichten nach Gerät und Nachrichtentyp
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from core.logger import logger
+
+def _safe_call(callback, device, message_type, event):
+    """Ruft einen Abonnenten auf, ohne dass dessen Fehler den Aufrufer treffen"""
+    try:
+        callback(device, message_type, event)
+    except Exception as e:
+        logger.error(f"Fehler in Event-Callback für {device}/{message_type}: {e}")
+
+class TkExecutor:
+    """Führt Callbacks im Tk-Mainloop aus
+
+    Tk ist nicht thread-sicher: andere Threads legen Aufrufe nur in eine
+    Queue, die der Mainloop per ``after`` regelmäßig abarbeitet.
+    """
+
+    def __init__(self, root, interval_ms=50):
+        self.root = root
+        self.interval_ms = interval_ms
+        self._calls = queue.SimpleQueue()
+        self.root.after(self.interval_ms, self._drain)
+
+    def submit(self, fn, *args):
+        self._calls.put((fn, args))
+
+    def _drain(self):
+        try:
+            while True:
+                fn, args = self._calls.get_nowait()
+                fn(*args)
+        except queue.Empty:
+            pass
+        self.root.after(self.interval_ms, self._drain)
+
+class Subscription:
+    """Handle einer Anmeldung (für unsubscribe)"""
+
+    __slots__ = ('callback', 'device', 'message_type', 'executor')
+
+    def __init__(self, callback, device, message_type, executor):
+        self.callback = callback
+        self.device = device
+        self.message_type = message_type
+        self.executor = executor
+
+class EventBus:
+    """Verteilt Nachrichten an Abonnenten nach (Gerät, Nachrichtentyp)
+
+    ``None`` steht jeweils für "alle". Beim Veröffentlichen werden nur die
+    vier passenden Themen nachgeschlagen, der Aufwand wächst also mit der
+    Zahl der Abonnenten dieses Themas, nicht mit allen Nachrichten.
+    Callbacks laufen je nach ``executor`` direkt im I/O-Thread ('io'), in
+    einem Worker-Pool ('pool') oder über ein Objekt mit ``submit(fn, *args)``
+    (z.B. TkExecutor).
+    """
+
+    def __init__(self, pool_workers=2):
+        self._topics = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_workers = pool_workers
+
+    def subscribe(self, callback, device=None, message_type=None, executor='io'):
+        """Meldet callback(device, message_type, event) an und liefert ein Subscription-Handle"""
+        if executor not in ('io', 'pool') and not hasattr(executor, 'submit'):
+            raise ValueError(f"Unbekannter Executor: {executor!r}")
+        key = (device, message_type.encode('ascii') if message_type else None)
+        subscription = Subscription(callback, device, message_type, executor)
+        with self._lock:
+            # Copy-on-write: publish iteriert ohne Lock über ein unveränderliches Tupel
+            self._topics[key] = self._topics.get(key, ()) + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        key = (subscription.device,
+               subscription.message_type.encode('ascii') if subscription.message_type else None)
+        with self._lock:
+            remaining = tuple(s for s in self._topics.get(key, ()) if s is not subscription)
+            if remaining:
+                self._topics[key] = remaining
+            else:
+                self._topics.pop(key, None)
+
+    def publish(self, device, message_type, event):
+        """Veröffentlicht ein Ereignis; message_type als Bytes-Präfix (z.B. b'SENSOR')"""
+        topics = self._topics
+        if not topics:
+            return 0
+        matches = [
+            subscription
+            for key in ((device, message_type), (device, None), (None, message_type), (None, None))
+            for subscription in topics.get(key, ())
+        ]
+        if matches:
+            type_name = message_type.decode('ascii', 'replace')
+            for subscription in matches:
+                executor = subscription.executor
+                if executor == 'io':
+                    _safe_call(subscription.callback, device, type_name, event)
+                    continue
+                if executor == 'pool':
+                    executor = self._get_pool()
+                executor.submit(_safe_call, subscription.callback,
+                                device, type_name, event)
+        return len(matches)
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self._pool_workers,
+                                                thread_name_prefix="EventPool")
+            return self._pool
+
+    def shutdown(self):
+        """Beendet den Worker-Pool; Abonnements bleiben erhalten"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown(wait=False)
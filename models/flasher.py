@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Firmware-Flasher für Dynamic Messe Stand V4
+Überträgt Firmware-Images blockweise mit CRC32 je Block und Wiederaufnahme
+"""
+
+import base64
+import queue
+import time
+import zlib
+from core.logger import logger
+from core.config import config
+from models.writer import BULK
+
+# Bootloader-Protokoll (Textzeilen, Blockdaten Base64-kodiert):
+#   Host  -> FLASH_BEGIN:<größe>:<crc32>      Board -> FLASH_READY:<offset>
+#   Host  -> FLASH_DATA:<offset>:<crc32>:<b64> Board -> FLASH_OK:<neues_ende>
+#                                              Board -> FLASH_ERR:<erwartet>:<grund>
+#   Host  -> FLASH_END                         Board -> FLASH_DONE:<crc32>
+# FLASH_READY liefert bei gleichem Image den bereits empfangenen Stand (Resume).
+FLASH_REPLIES = (b'FLASH_READY', b'FLASH_OK', b'FLASH_ERR', b'FLASH_DONE')
+
+class FlashError(Exception):
+    """Flash-Vorgang endgültig fehlgeschlagen"""
+
+class _Stalled(Exception):
+    """Board antwortet nicht mehr - Versuch wird neu aufgesetzt"""
+
+class FirmwareFlasher:
+    """Flasht ein Image über eine HardwareConnection
+
+    Bis zu ``window`` Blöcke sind gleichzeitig unterwegs (Go-Back-N): meldet
+    das Board einen CRC- oder Reihenfolgefehler, wird ab dem erwarteten Offset
+    neu gesendet. Bleiben Antworten aus, beginnt ein neuer Versuch mit
+    FLASH_BEGIN und setzt beim vom Board gemeldeten Stand fort.
+    """
+
+    def __init__(self, connection, image, chunk_size=None, window=None,
+                 chunk_timeout=None, max_attempts=None, progress=None):
+        self.connection = connection
+        self.image = memoryview(image)
+        self.size = len(image)
+        self.crc = zlib.crc32(image)
+        self.chunk_size = chunk_size or config.hardware['flash_chunk_size']
+        self.window = window or config.hardware['flash_window']
+        self.chunk_timeout = chunk_timeout or config.hardware['flash_chunk_timeout']
+        self.max_attempts = max_attempts or config.hardware['flash_attempts']
+        self.progress = progress
+        self._replies = queue.SimpleQueue()
+        self.report = {
+            'state': 'pending', 'total': self.size, 'done': 0, 'percent': 0.0,
+            'throughput': 0.0, 'retransmits': 0, 'attempts': 0, 'resumed_from': None,
+            'duration': 0.0, 'error': None
+        }
+        self._started = None
+        self._start_offset = 0
+
+    def on_reply(self, prefix, rest):
+        """Antwort des Bootloaders (aus dem Lese-Thread der Verbindung)"""
+        self._replies.put((prefix, rest))
+
+    def run(self):
+        """Flasht das Image und liefert den Bericht; wirft FlashError bei Misserfolg"""
+        self.report['state'] = 'flashing'
+        self._started = time.monotonic()
+        try:
+            while self.report['attempts'] < self.max_attempts:
+                self.report['attempts'] += 1
+                try:
+                    self._attempt()
+                    self.report['state'] = 'done'
+                    return self.report
+                except _Stalled as e:
+                    logger.warning(f"Flash {self.connection.name}: {e} - "
+                                   f"Versuch {self.report['attempts']}/{self.max_attempts}")
+                    self._wait_connected()
+            raise FlashError(f"{self.connection.name}: nach {self.max_attempts} Versuchen abgebrochen")
+        except FlashError as e:
+            self.report['state'] = 'failed'
+            self.report['error'] = str(e)
+            raise
+        finally:
+            self.report['duration'] = time.monotonic() - self._started
+            self._notify()
+
+    def _attempt(self):
+        # Antworten eines abgebrochenen Versuchs verwerfen
+        while not self._replies.empty():
+            self._replies.get_nowait()
+
+        self._send(f"FLASH_BEGIN:{self.size}:{self.crc:08x}\n".encode('ascii'))
+        acked = self._expect(b'FLASH_READY')
+        if acked:
+            logger.info(f"Flash {self.connection.name}: setze bei {acked}/{self.size} Bytes fort")
+            self.report['resumed_from'] = acked
+        if self.report['attempts'] == 1:
+            self._start_offset = acked
+        self._set_done(acked)
+
+        next_offset = acked
+        limit = self.window * self.chunk_size
+        while acked < self.size:
+            while next_offset < self.size and next_offset - acked < limit:
+                next_offset = self._send_chunk(next_offset)
+            prefix, rest = self._next_reply()
+            if prefix == b'FLASH_OK':
+                acked = max(acked, int(rest))
+                self._set_done(acked)
+            elif prefix == b'FLASH_ERR':
+                expected, _, reason = rest.partition(b':')
+                acked = next_offset = int(expected)
+                self.report['retransmits'] += 1
+                logger.debug(f"Flash {self.connection.name}: {reason.decode('ascii', 'replace')} "
+                             f"bei {acked}, sende erneut")
+                self._set_done(acked)
+
+        self._send(b"FLASH_END\n")
+        prefix, rest = self._next_reply()
+        if prefix != b'FLASH_DONE' or int(rest, 16) != self.crc:
+            # Board hat das Image verworfen; der nächste Versuch beginnt bei 0
+            raise _Stalled(f"Image-Prüfung fehlgeschlagen ({prefix.decode()}:{rest.decode()})")
+
+    def _send_chunk(self, offset):
+        chunk = self.image[offset:offset + self.chunk_size]
+        line = b'FLASH_DATA:%d:%08x:%s\n' % (offset, zlib.crc32(chunk), base64.b64encode(chunk))
+        self._send(line)
+        return offset + len(chunk)
+
+    def _send(self, payload):
+        future = self.connection._submit(payload, description=payload[:24], priority=BULK)
+        # Ohne laufenden Writer schlägt das Einreihen sofort fehl - kein Warten auf Timeouts
+        if future.done() and future.exception():
+            raise FlashError(f"{self.connection.name}: {future.exception()}")
+
+    def _next_reply(self):
+        try:
+            return self._replies.get(timeout=self.chunk_timeout)
+        except queue.Empty:
+            raise _Stalled(f"keine Antwort nach {self.chunk_timeout}s")
+
+    def _expect(self, expected_prefix):
+        while True:
+            prefix, rest = self._next_reply()
+            if prefix == expected_prefix:
+                return int(rest)
+
+    def _wait_connected(self):
+        """Wartet kurz auf einen Reconnect (z.B. durch den Supervisor)"""
+        deadline = time.monotonic() + config.hardware['flash_reconnect_wait']
+        while self.connection.status != "connected" and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+    def _set_done(self, done):
+        elapsed = time.monotonic() - self._started
+        self.report['done'] = done
+        self.report['percent'] = round(100.0 * done / self.size, 1) if self.size else 100.0
+        self.report['throughput'] = (done - self._start_offset) / elapsed if elapsed > 0 else 0.0
+        self._notify()
+
+    def _notify(self):
+        if self.progress:
+            try:
+                self.progress(self.connection.device_id, dict(self.report))
+            except Exception as e:
+                logger.error(f"Fehler in Flash-Fortschritts-Callback: {e}")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Zeilen-Framing für Dynamic Messe Stand V4
+Liest serielle Daten in einen wiederverwendeten Puffer und zerlegt sie ohne Kopien
+"""
+
+import os
+from models.telemetry import message_type, parse_line
+
+class SerialLine:
+    """Empfangene Zeile; dekodiert wird erst, wenn jemand den Text abfragt"""
+
+    __slots__ = ('timestamp', 'source', 'raw', '_text', '_record')
+
+    _KEYS = ('timestamp', 'source', 'data')
+
+    def __init__(self, timestamp, source, raw):
+        self.timestamp = timestamp
+        self.source = source
+        self.raw = raw
+        self._text = None
+        self._record = False
+
+    @property
+    def data(self):
+        """Dekodierter Zeileninhalt (wird beim ersten Zugriff erzeugt)"""
+        if self._text is None:
+            self._text = self.raw.decode('utf-8', errors='replace')
+        return self._text
+
+    @property
+    def type(self):
+        """Nachrichtentyp (Präfix vor dem ersten ':'), z.B. 'SENSOR'"""
+        return message_type(self.raw)
+
+    @property
+    def record(self):
+        """Typisierter Datensatz aus models.telemetry (einmalig geparst, None wenn unbekannt)"""
+        if self._record is False:
+            self._record = parse_line(self.timestamp, self.source, self.raw)
+        return self._record
+
+    def __getitem__(self, key):
+        # Kompatibel zu den bisherigen {'timestamp', 'source', 'data'}-Dicts
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return self[key] if key in self._KEYS else default
+
+    def keys(self):
+        return self._KEYS
+
+    def __repr__(self):
+        return f"SerialLine({self.source!r}, {self.raw!r})"
+
+class LineFramer:
+    """Zerlegt einen Bytestrom in Zeilen, ohne pro Zeile Zwischenobjekte anzulegen
+
+    Die an den Handler übergebene memoryview zeigt direkt in den internen Puffer
+    und ist nur während des Aufrufs gültig; wer die Zeile behalten will, kopiert
+    sie mit ``bytes(view)``.
+    """
+
+    def __init__(self, size=4096):
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        self.fill = 0
+        self.overflows = 0
+
+    def reset(self):
+        """Verwirft eine angefangene Zeile (z.B. nach einem Reconnect)"""
+        self.fill = 0
+
+    def read_from_fd(self, fd):
+        """Liest direkt per readv in den freien Pufferbereich"""
+        return self._account(os.readv(fd, [self.view[self.fill:]]))
+
+    def read_from(self, stream, count):
+        """Liest höchstens count Bytes über readinto eines Streams (z.B. serial.Serial)"""
+        free = len(self.buffer) - self.fill
+        return self._account(stream.readinto(self.view[self.fill:self.fill + min(count, free)]) or 0)
+
+    def _account(self, count):
+        self.fill += count
+        return count
+
+    def drain(self, handler):
+        """Ruft handler(memoryview) für jede vollständige, nicht-leere Zeile auf"""
+        buffer = self.buffer
+        view = self.view
+        start = 0
+        while True:
+            end = buffer.find(b'\n', start, self.fill)
+            if end < 0:
+                break
+            # Führende und abschließende Leerzeichen/CR ohne Kopie überspringen
+            stop = end
+            while stop > start and buffer[stop - 1] in b' \t\r':
+                stop -= 1
+            first = start
+            while first < stop and buffer[first] in b' \t\r':
+                first += 1
+            if first < stop:
+                handler(view[first:stop])
+            start = end + 1
+
+        if start:
+            # Angefangene Zeile an den Pufferanfang schieben (nur der Zeilenrest wird kopiert)
+            remaining = self.fill - start
+            buffer[:remaining] = buffer[start:self.fill]
+            self.fill = remaining
+        elif self.fill == len(buffer):
+            # Zeile länger als der Puffer: verwerfen statt unbegrenzt zu wachsen
+            self.overflows += 1
+            self.fill = 0
@@ -5,52 +5,254 @@ ESP32 und Arduino GIGA Verbindungsmanagement
 """
 
 import serial
+import selectors
 import threading
 import time
-import queue
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from core.logger import logger
 from core.config import config
+from models.io_engine import SerialIOEngine
+from models.framing import LineFramer, SerialLine
+from models.ring_buffer import RingBuffer
+from models.writer import CommandWriter, CONTROL
+from models.recorder import CONNECT, DISCONNECT, INBOUND, TrafficRecorder
+from models.supervisor import HardwareSupervisor
+from models.metrics import LatencyHistogram
+from models.telemetry import SensorColumns
+from models.events import EventBus
+from models.flasher import FirmwareFlasher, FlashError, FLASH_REPLIES
+from models.shadow import StateShadow, signal_key
+from models.clocksync import ClockOffsetEstimator, host_us
+from models.streamer import FrameStreamer
+from models.registry import DeviceRegistry
+from models.codec import (
+    CODECS, BinaryCodec, TextCodec, PROTOCOL_QUERY, PROTOCOL_ACCEPT,
+    BAUD_QUERY, BAUD_SET, BAUD_TEST, BAUD_PATTERN
+)
 
 class HardwareConnection:
     """Basis-Klasse für Hardware-Verbindungen"""
     
-    def __init__(self, port, name, baud_rate=115200):
+    def __init__(self, port, name, baud_rate=None, read_mode=None,
+                 queue_capacity=None, queue_policy=None, protocol=None):
         self.port = port
         self.name = name
-        self.baud_rate = baud_rate
+        self.base_baud_rate = baud_rate or config.hardware['baud_rate']
+        self.baud_rate = self.base_baud_rate  # nach dem Verbinden die ausgehandelte Rate
+        self.baud_fallbacks = 0
+        self._failed_bauds = {}  # Rate -> monotonic-Zeitpunkt, ab dem sie wieder versucht wird
+        self.read_mode = read_mode or config.hardware['read_mode']
         self.connection = None
         self.thread = None
+        self.io_engine = None
         self.running = False
-        self.data_queue = queue.Queue()
+        self.data_queue = RingBuffer(
+            queue_capacity or config.hardware['queue_capacity'],
+            queue_policy or config.hardware['queue_policy']
+        )
         self.status = "disconnected"
+        self.framer = LineFramer()
+        self.writer = CommandWriter(
+            self,
+            rate=config.hardware['tx_rate'],
+            burst=config.hardware['tx_burst']
+        )
+        self.protocol = protocol or config.hardware['protocol']
+        self.codec = TextCodec()
+        self.recorder = None
+        self.connecting = False
+        self.link_lock = threading.Lock()  # Nur ein Connect/Reconnect samt Aktivierung zugleich
+        self.reconnect_count = 0
+        self.downtime = 0.0
+        self.down_since = None
+        self.latency = LatencyHistogram()
+        self.acks_lost = 0
+        self._sequence = 0
+        self._pending_acks = {}
+        self._ack_lock = threading.Lock()
+        self.last_seen = None
+        self.heartbeat_rtt = None
+        self.missed_beats = 0
+        self.missed_beats_total = 0
+        self._ping_seq = 0
+        self._ping_sent_at = None
+        self._next_heartbeat = 0.0
+        self.telemetry = None
+        self.events = None
+        self.shadow = None
+        self.device_id = name
+        self.clock = ClockOffsetEstimator(config.hardware['clock_sync_samples'])
+        self._tsync_seq = 0
+        self._tsync_sent = {}
+        self._tsync_event = threading.Event()
+        self._next_clock_sync = 0.0
+        self._clock_retry = 0.0
+        self._tsync_warned = False
+        # Steuer-Antworten, die nicht in der Daten-Queue landen
+        self._control_handlers = {
+            b'ACK': self._handle_ack,
+            b'PONG': self._handle_pong,
+            b'TSYNC': self._handle_tsync,
+        }
     
     def connect(self):
         """Verbindung zur Hardware herstellen"""
+        self.connecting = True
         try:
+            self.framer.reset()
+            self.clock.reset()  # Board-Uhr beginnt nach einem Reset neu
+            self._next_clock_sync = 0.0  # Abgleich erst mit dem neuen Link wieder aufnehmen
+            self._clock_retry = 0.0
+            # Jedes Öffnen beginnt mit der Grundrate (Board startet nach Reset ebenso)
+            self.baud_rate = self.base_baud_rate
             self.connection = serial.Serial(
                 self.port, 
                 self.baud_rate, 
                 timeout=config.hardware['timeout']
             )
+            self._negotiate_protocol()
+            self._negotiate_baud()
             self.status = "connected"
-            logger.info(f"{self.name} verbunden auf {self.port}")
+            self._record(CONNECT, self.port.encode('utf-8'))
+            self.writer.start()
+            self.writer.resume()
+            logger.info(f"{self.name} verbunden auf {self.port} ({self.baud_rate} Baud)")
             return True
         except Exception as e:
             self.status = "error"
             logger.error(f"Fehler beim Verbinden mit {self.name}: {e}")
             return False
+        finally:
+            self.connecting = False
+    
+    def _negotiate_protocol(self):
+        """Wählt beim Verbinden das Befehlsformat (binär, falls das Board es bestätigt)"""
+        if self.protocol in CODECS:
+            self.codec = CODECS[self.protocol]()
+        elif self._handshake(PROTOCOL_QUERY, PROTOCOL_ACCEPT):
+            self.codec = BinaryCodec()
+        else:
+            self.codec = TextCodec()
+        logger.debug(f"{self.name} nutzt Protokoll '{self.codec.name}'")
+    
+    def _negotiate_baud(self):
+        """Stellt auf die höchste Baudrate um, die Host und Board beide beherrschen
+        
+        Jeder Wechsel wird mit einem Testmuster geprüft. Schlägt er fehl, geht
+        der Host auf die bisherige Rate zurück (das Board ebenso nach
+        ``baud_confirm_timeout``) und versucht die nächstniedrigere Rate.
+        Fehlgeschlagene Raten werden bei Reconnects für ``baud_retry_after``
+        Sekunden übersprungen.
+        """
+        now = time.monotonic()
+        candidates = [rate for rate in config.hardware['baud_rates']
+                      if rate > self.baud_rate and self._failed_bauds.get(rate, 0.0) <= now]
+        if not candidates:
+            return
+        reply = self._handshake(BAUD_QUERY, "BAUD:")
+        if reply is None:
+            logger.debug(f"{self.name} kennt keine Baudraten-Aushandlung, bleibt bei {self.baud_rate}")
+            return
+        supported = {int(rate) for rate in reply[5:].split(',') if rate.strip().isdigit()}
+        for rate in sorted(set(candidates) & supported, reverse=True):
+            if self._switch_baud(rate):
+                logger.info(f"{self.name}: Baudrate {rate} ausgehandelt")
+                return
+            self.baud_fallbacks += 1
+            self._failed_bauds[rate] = time.monotonic() + config.hardware['baud_retry_after']
+            if not self._verify_baud():
+                raise serial.SerialException(f"Keine Verbindung mehr nach Rückfall auf {self.baud_rate} Baud")
+    
+    def _switch_baud(self, rate):
+        """Ein Wechsel auf ``rate``; False, wenn das Board ablehnt oder das Testmuster nicht ankommt"""
+        reply = self._handshake(f"{BAUD_SET}:{rate}", "BAUD_")
+        if reply != f"BAUD_OK:{rate}":
+            return False
+        previous = self.baud_rate
+        self.connection.baudrate = rate
+        time.sleep(config.hardware['baud_settle'])
+        if self._verify_baud():
+            self.baud_rate = rate
+            return True
+        logger.warning(f"{self.name}: Testmuster bei {rate} Baud fehlerhaft, zurück auf {previous}")
+        self.connection.baudrate = previous
+        time.sleep(config.hardware['baud_confirm_timeout'])  # Board fällt ebenfalls zurück
+        return False
+    
+    def _verify_baud(self):
+        """Prüft die aktuelle Rate mit dem Testmuster (Echo des Boards)"""
+        request = f"{BAUD_TEST}:{BAUD_PATTERN}"
+        return self._handshake(request, f"{BAUD_TEST}:") == request
+    
+    def _handshake(self, request, expected_prefix, timeout=None):
+        """Sendet eine Anfrage direkt und wartet auf eine Antwortzeile mit Präfix
+        
+        Nur vor dem Start von Reader und Writer verwenden. Liefert die Antwort
+        (ohne Zeilenende) oder None bei Zeitüberschreitung.
+        """
+        timeout = timeout if timeout is not None else config.hardware['handshake_timeout']
+        deadline = time.monotonic() + timeout
+        original_timeout = self.connection.timeout
+        try:
+            self.connection.reset_input_buffer()
+            self.connection.write(f"{request}\n".encode('utf-8'))
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.connection.timeout = remaining
+                line = self.connection.readline().decode('utf-8', errors='replace').strip()
+                if line.startswith(expected_prefix):
+                    return line
+        finally:
+            self.connection.timeout = original_timeout
     
     def disconnect(self):
         """Verbindung trennen"""
-        self.running = False
-        if self.thread and self.thread.is_alive():
-            self.thread.join(timeout=2)
+        self._stop_reading()
+        self.writer.stop()
         
         if self.connection and self.connection.is_open:
             self.connection.close()
             self.status = "disconnected"
+            self._record(DISCONNECT)
             logger.info(f"{self.name} getrennt")
     
+    def reconnect(self):
+        """Baut die Verbindung neu auf; eingereihte Befehle bleiben im Writer erhalten
+        
+        Der Writer pausiert, bis connect() die Handshakes abgeschlossen hat, damit
+        keine eingereihten Befehle zwischen PROTO?/BAUD? und deren Antworten geraten.
+        """
+        self.writer.pause()
+        self._stop_reading()
+        if self.connection:
+            try:
+                self.connection.close()
+            except Exception:
+                pass  # Port ist nach einem Abriss oft schon ungültig
+            self._record(DISCONNECT)
+        self.status = "reconnecting"
+        return self.connect()
+    
+    def _stop_reading(self):
+        """Beendet Reader-Thread bzw. Engine-Registrierung"""
+        self.running = False
+        if self.io_engine:
+            self.io_engine.unregister(self)
+        if self.thread and self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+    
+    def is_healthy(self):
+        """True, wenn Port offen ist und Reader sowie Writer laufen"""
+        if self.status != "connected" or not self.connection or not self.connection.is_open:
+            return False
+        if not self.writer.thread or not self.writer.thread.is_alive():
+            return False
+        if self.io_engine:
+            return True
+        return bool(self.thread and self.thread.is_alive())
+    
     def start_reading(self):
         """Startet das Lesen von Daten in einem separaten Thread"""
         if not self.connection or not self.connection.is_open:
@@ -63,131 +265,856 @@ class HardwareConnection:
     
     def _read_loop(self):
         """Lese-Schleife für eingehende Daten"""
+        if self.read_mode == "event" and self._fileno() is not None:
+            self._event_read_loop()
+        else:
+            self._poll_read_loop()
+    
+    def _fileno(self):
+        """Dateideskriptor des Ports (None, falls die Plattform keinen liefert)"""
+        try:
+            return self.connection.fileno()
+        except (AttributeError, OSError, ValueError):
+            return None
+    
+    def _poll_read_loop(self):
+        """Klassische Lese-Schleife mit 10-ms-Polling auf in_waiting"""
         while self.running and self.connection and self.connection.is_open:
             try:
                 if self.connection.in_waiting > 0:
-                    data = self.connection.readline().decode('utf-8').strip()
-                    if data:
-                        self.data_queue.put({
-                            'timestamp': time.time(),
-                            'source': self.name,
-                            'data': data
-                        })
+                    self._on_readable()
+                self._heartbeat_tick(time.monotonic())
                 time.sleep(0.01)  # Kurze Pause
             except Exception as e:
                 logger.error(f"Fehler beim Lesen von {self.name}: {e}")
+                self.status = "error"
                 break
     
+    def _event_read_loop(self):
+        """Ereignisgesteuerte Lese-Schleife: blockiert auf dem Dateideskriptor"""
+        timeout = config.hardware['select_timeout']
+        selector = selectors.DefaultSelector()
+        try:
+            selector.register(self._fileno(), selectors.EVENT_READ)
+            while self.running and self.connection and self.connection.is_open:
+                try:
+                    # Timeout nur, damit ein gesetztes running=False bemerkt wird
+                    if selector.select(timeout):
+                        self._on_readable()
+                    self._heartbeat_tick(time.monotonic())
+                except Exception as e:
+                    logger.error(f"Fehler beim Lesen von {self.name}: {e}")
+                    self.status = "error"
+                    break
+        finally:
+            selector.close()
+    
+    def _on_readable(self, handler=None):
+        """Liest alle verfügbaren Bytes in den Framer und verarbeitet vollständige Zeilen"""
+        fd = self._fileno()
+        if fd is not None:
+            count = self.framer.read_from_fd(fd)
+        else:
+            count = self.framer.read_from(self.connection, self.connection.in_waiting or 1)
+        if not count:
+            raise serial.SerialException("Port meldet lesbar, liefert aber keine Daten (Gerät getrennt?)")
+        self.last_seen = time.monotonic()
+        self.framer.drain(handler or self._handle_line)
+    
+    def _heartbeat_tick(self, now):
+        """Sendet periodisch PING und zählt ausgebliebene PONGs (läuft im I/O-Thread)"""
+        sync_interval = config.hardware['clock_sync_interval']
+        if (config.hardware['clock_sync'] and sync_interval and now >= self._next_clock_sync
+                and self.status == "connected"):
+            # Offset nachführen, damit Uhren-Drift nicht aufläuft; ohne Abgleich
+            # (z.B. nach einem Reconnect) stellt dies den ersten Messwert her -
+            # mit verdoppeltem Abstand je Fehlversuch bis zum normalen Intervall
+            if self.clock.synced:
+                self._clock_retry = 0.0
+                self._next_clock_sync = now + sync_interval
+            else:
+                retry = self._clock_retry or config.hardware['heartbeat_interval'] or sync_interval
+                self._clock_retry = min(retry * 2, sync_interval)
+                self._next_clock_sync = now + retry
+            self._send_tsync()
+        
+        interval = config.hardware['heartbeat_interval']
+        if not interval or now < self._next_heartbeat or self.status != "connected":
+            return
+        self._next_heartbeat = now + interval
+        self._expire_acks(now)
+        
+        if self._ping_sent_at is not None:
+            self.missed_beats += 1
+            self.missed_beats_total += 1
+            if self.missed_beats == config.hardware['heartbeat_miss_limit']:
+                logger.warning(f"{self.name}: {self.missed_beats} Heartbeats ohne Antwort")
+        
+        self._ping_seq = (self._ping_seq + 1) % 0x8000
+        self._ping_sent_at = now
+        try:
+            self._submit(self.codec.encode("PING", self._ping_seq))
+        except ValueError:
+            pass
+    
+    def _handle_pong(self, seq_text):
+        """Verarbeitet die Antwort auf den letzten PING"""
+        if self._ping_sent_at is None or seq_text != str(self._ping_seq).encode('ascii'):
+            return  # verspätete Antwort auf einen älteren PING
+        self.heartbeat_rtt = time.monotonic() - self._ping_sent_at
+        self._ping_sent_at = None
+        self.missed_beats = 0
+    
+    def sync_clock(self, samples=None, timeout=None):
+        """Gleicht die Board-Uhr per TSYNC ab; False, wenn das Board nicht antwortet"""
+        samples = samples or config.hardware['clock_sync_samples']
+        timeout = timeout or config.hardware['handshake_timeout']
+        for _ in range(samples):
+            self._tsync_event.clear()
+            self._send_tsync()
+            if not self._tsync_event.wait(timeout):
+                # Kein TSYNC-Support: bis zum nächsten Connect nicht erneut nachfragen
+                self._next_clock_sync = float('inf')
+                message = f"{self.name}: keine TSYNC-Antwort - zeitgesteuerte Befehle nicht verfügbar"
+                if self._tsync_warned:
+                    logger.debug(message)
+                else:
+                    logger.warning(message)
+                    self._tsync_warned = True
+                return False
+        self._tsync_warned = False
+        self._next_clock_sync = time.monotonic() + config.hardware['clock_sync_interval']
+        stats = self.clock.get_stats()
+        logger.debug(f"{self.name}: Uhr-Offset {stats['offset_us']} µs (Laufzeit {stats['delay_us']} µs)")
+        return True
+    
+    def _send_tsync(self):
+        self._tsync_seq = (self._tsync_seq + 1) % 0x8000
+        if len(self._tsync_sent) > 16:
+            self._tsync_sent.clear()  # unbeantwortete Anfragen verwerfen
+        t1 = host_us()
+        self._tsync_sent[self._tsync_seq] = t1
+        self._submit(self.codec.encode("TSYNC", self._tsync_seq, t1))
+    
+    def _handle_tsync(self, rest):
+        """TSYNC:<seq>:<t1>:<t2>:<t3> - Antwort des Boards mit seinen Zeitstempeln"""
+        t4 = host_us()
+        try:
+            seq, t1, t2, t3 = (int(part) for part in rest.split(b':'))
+        except ValueError:
+            return
+        if self._tsync_sent.pop(seq, None) != t1:
+            return  # unbekannte oder verspätete Antwort
+        self.clock.add_sample(t1, t2, t3, t4)
+        self._tsync_event.set()
+    
+    def get_liveness(self, now=None):
+        """Zwischengespeicherter Lebendigkeits-Status (liest nur Attribute, kein I/O)"""
+        now = now or time.monotonic()
+        return {
+            'last_seen_age': round(now - self.last_seen, 3) if self.last_seen else None,
+            'rtt_ms': round(self.heartbeat_rtt * 1000, 3) if self.heartbeat_rtt is not None else None,
+            'missed_beats': self.missed_beats,
+            'missed_beats_total': self.missed_beats_total,
+            'alive': (self.status == "connected" and
+                      self.missed_beats < config.hardware['heartbeat_miss_limit'])
+        }
+    
+    def _handle_line(self, line):
+        """Legt eine empfangene Zeile (memoryview in den Framer-Puffer) in der Daten-Queue ab"""
+        raw = bytes(line)
+        if self.recorder:
+            self.recorder.record(INBOUND, self.device_id, raw)
+        prefix, _, rest = raw.partition(b':')
+        control = self._control_handlers.get(prefix)
+        if control:
+            control(rest)
+            return
+        entry = SerialLine(time.time(), self.device_id, raw)
+        if self.telemetry is not None and prefix == b'SENSOR' and entry.record:
+            self.telemetry.append(entry.record)
+        if self.events is not None:
+            self.events.publish(self.device_id, prefix, entry)
+        self.data_queue.put(entry)
+    
+    def _handle_ack(self, seq_text):
+        """Ordnet eine Quittung ihrem Befehl zu und erfasst die Round-Trip-Zeit"""
+        received = time.monotonic()
+        try:
+            seq = int(seq_text)
+        except ValueError:
+            return
+        with self._ack_lock:
+            pending = self._pending_acks.pop(seq, None)
+        if not pending:
+            return  # zu spät oder unbekannt
+        queued_at, write_future, ack_future = pending
+        # Ab Schreibende messen, damit Wartezeit in der Sende-Queue nicht mitzählt
+        sent_at = write_future.result() if write_future.done() and not write_future.exception() else queued_at
+        rtt = received - sent_at
+        self.latency.record(rtt)
+        if not ack_future.done():
+            ack_future.set_result(rtt)
+    
+    def _expire_acks(self, now=None):
+        """Wertet ausstehende Quittungen nach ack_timeout als verloren"""
+        now = now or time.monotonic()
+        timeout = config.hardware['ack_timeout']
+        with self._ack_lock:
+            expired = [seq for seq, (queued_at, _, _) in self._pending_acks.items()
+                       if now - queued_at > timeout]
+            expired = [self._pending_acks.pop(seq) for seq in expired]
+        for _, _, ack_future in expired:
+            self.acks_lost += 1
+            if not ack_future.done():
+                ack_future.set_exception(TimeoutError(f"Keine Quittung von {self.name}"))
+    
+    def _record(self, event, payload=b''):
+        """Meldet ein Ereignis an einen angehängten Traffic-Recorder und den Event-Bus"""
+        if self.recorder:
+            self.recorder.record(event, self.device_id, payload)
+        if self.events is not None and event in (CONNECT, DISCONNECT):
+            self.events.publish(self.device_id, b'CONNECT' if event == CONNECT else b'DISCONNECT', self.status)
+    
     def send_data(self, data):
-        """Daten an Hardware senden"""
+        """Daten an Hardware senden (wartet, bis der Writer-Thread geschrieben hat)"""
         if not self.connection or not self.connection.is_open:
             return False
         
+        return self._wait(self.send_data_async(data))
+    
+    def send_command(self, command, *args, block=True, ack=False, priority=CONTROL):
+        """Sendet einen Befehl im ausgehandelten Protokoll (block=False: liefert ein Future)
+        
+        Mit ``ack`` trägt der Befehl eine Sequenznummer, das Board antwortet mit
+        ``ACK:<seq>``. Das gelieferte Future enthält dann die Round-Trip-Zeit in
+        Sekunden; mit block=True wird bis ``ack_timeout`` auf die Quittung gewartet.
+        ``priority`` wählt die Sende-Spur (CONTROL überholt BULK).
+        """
+        seq = self._next_sequence() if ack else None
+        try:
+            payload = self.codec.encode(command, *args, seq=seq)
+        except ValueError as e:
+            logger.error(f"Befehl für {self.name} nicht kodierbar: {e}")
+            if not block:
+                future = Future()
+                future.set_exception(e)
+                return future
+            return False
+        future = self._submit(payload, description=':'.join([command, *map(str, args)]),
+                              priority=priority)
+        if ack:
+            future = self._track_ack(seq, future)
+            if block:
+                return self._wait(future, config.hardware['ack_timeout'])
+            return future
+        return future if not block else self._wait(future)
+    
+    def _next_sequence(self):
+        with self._ack_lock:
+            self._sequence = self._sequence % 0xFFFF + 1
+            return self._sequence
+    
+    def _track_ack(self, seq, write_future):
+        """Merkt einen quittierungspflichtigen Befehl vor und liefert das Quittungs-Future"""
+        ack_future = Future()
+        ack_future.write_future = write_future  # Schreibende bleibt für den Broadcast-Versatz abrufbar
+        self._expire_acks()
+        with self._ack_lock:
+            self._pending_acks[seq] = (time.monotonic(), write_future, ack_future)
+        
+        def on_written(future):
+            # Schreibfehler direkt an das Quittungs-Future weitergeben
+            if future.exception() is not None:
+                with self._ack_lock:
+                    self._pending_acks.pop(seq, None)
+                if not ack_future.done():
+                    ack_future.set_exception(future.exception())
+        
+        write_future.add_done_callback(on_written)
+        return ack_future
+    
+    def get_latency_summary(self):
+        """Latenz-Kennzahlen der quittierten Befehle"""
+        self._expire_acks()
+        summary = self.latency.summary()
+        summary['lost'] = self.acks_lost
+        return summary
+    
+    def _wait(self, future, timeout=None):
+        """Wartet auf einen Schreibvorgang und übersetzt das Ergebnis in True/False"""
         try:
-            self.connection.write(f"{data}\n".encode('utf-8'))
-            logger.debug(f"Gesendet an {self.name}: {data}")
+            future.result(timeout=timeout or config.hardware['write_timeout'])
             return True
         except Exception as e:
             logger.error(f"Fehler beim Senden an {self.name}: {e}")
             return False
+    
+    def send_data_async(self, data, callback=None, priority=CONTROL):
+        """Reiht Daten zum Senden ein und kehrt sofort zurück
+        
+        Liefert ein Future; ``callback`` wird mit diesem Future aufgerufen,
+        sobald der Schreibvorgang abgeschlossen oder fehlgeschlagen ist.
+        """
+        return self._submit(f"{data}\n".encode('utf-8'), callback, data, priority)
+    
+    def _submit(self, payload, callback=None, description=None, priority=CONTROL):
+        """Übergibt fertige Bytes an den Writer-Thread
+        
+        Während eines Reconnects werden Befehle weiter eingereiht und nach dem
+        Wiederverbinden gesendet; nur ohne laufenden Writer schlägt das Senden fehl.
+        """
+        if not self.writer.running:
+            future = Future()
+            future.set_exception(serial.SerialException(f"{self.name} nicht verbunden"))
+        else:
+            future = self.writer.submit(payload, priority)
+            logger.debug(f"Eingereiht für {self.name}: {description or payload!r}")
+        if callback:
+            future.add_done_callback(callback)
+        return future
 
 class ESP32Connection(HardwareConnection):
     """ESP32-spezifische Verbindungsklasse"""
     
-    def __init__(self, port, instance_number=1):
-        super().__init__(port, f"ESP32-{instance_number}")
+    def __init__(self, port, instance_number=1, name=None):
+        super().__init__(port, name or f"ESP32-{instance_number}")
         self.instance_number = instance_number
         self.signals = {}
+        self.flasher = None
+        self.flash_report = None
+        self.streamer = None
+        for prefix in FLASH_REPLIES:
+            self._control_handlers[prefix] = lambda rest, prefix=prefix: self._handle_flash(prefix, rest)
     
-    def send_signal(self, signal_id, value=1):
-        """Sendet ein Signal an den ESP32"""
-        command = f"SIGNAL:{signal_id}:{value}"
-        return self.send_data(command)
+    def send_signal(self, signal_id, value=1, block=True, ack=None, force=False):
+        """Sendet ein Signal an den ESP32 (block=False: liefert ein Future)
+        
+        Zeigt das Board laut Zustands-Schatten bereits dieses Signal, wird nichts
+        gesendet: block=True liefert dann True, sonst ein erledigtes Future mit
+        Ergebnis None. ``force`` sendet trotzdem.
+        """
+        if ack is None:
+            ack = config.hardware['command_ack']
+        shadow = self.shadow
+        key = signal_key(signal_id)
+        if shadow is not None and not shadow.should_send(self.device_id, key, (signal_id, value), force):
+            if block:
+                return True
+            future = Future()
+            future.set_result(None)
+            return future
+        result = self.send_command("SIGNAL", signal_id, value, block=block, ack=ack)
+        if shadow is not None:
+            # Fehlgeschlagene Befehle dürfen den nächsten Versuch nicht unterdrücken
+            if block and not result:
+                shadow.invalidate(self.device_id, key)
+            elif not block:
+                result.add_done_callback(
+                    lambda future: future.exception() and shadow.invalidate(self.device_id, key)
+                )
+        return result
     
-    def flash_firmware(self, firmware_path):
-        """Flash neue Firmware auf ESP32"""
-        # Implementierung für Firmware-Flash
-        logger.info(f"Flashing firmware to {self.name}: {firmware_path}")
-        # Hier würde der tatsächliche Flash-Prozess implementiert
-        return True
+    def start_stream(self, frame_size=None, fps=None):
+        """Öffnet den LED-Frame-Stream und liefert den FrameStreamer
+        
+        Frames werden per ``streamer.submit(frame)`` bzw. ``acquire``/``publish``
+        übergeben und im BULK-Lane gesendet, Steuerbefehle haben Vorrang.
+        """
+        self.stop_stream()
+        self.streamer = FrameStreamer(self, frame_size or config.hardware['stream_frame_size'], fps)
+        self.streamer.start()
+        return self.streamer
+    
+    def stop_stream(self):
+        """Beendet einen laufenden Frame-Stream"""
+        if self.streamer:
+            self.streamer.stop()
+            self.streamer = None
+    
+    def disconnect(self):
+        """Beendet einen Frame-Stream und trennt die Verbindung"""
+        self.stop_stream()
+        super().disconnect()
+    
+    def send_signal_at(self, when, signal_id, value=1, block=False):
+        """Plant ein Signal zur Host-Zeit ``when`` (time.monotonic) auf dem Board ein
+        
+        Der Zeitpunkt wird über den Uhren-Abgleich in Board-Zeit umgerechnet;
+        das Board führt das Signal selbst aus, die USB-Latenz spielt keine Rolle.
+        """
+        board_time = self.clock.to_board(host_us(when))
+        return self.send_command("SIGNAL_AT", board_time, signal_id, value, block=block)
+    
+    def flash_firmware(self, firmware_path, progress=None, image=None):
+        """Flash neue Firmware auf ESP32
+        
+        ``progress(name, report)`` wird bei jedem quittierten Block aufgerufen;
+        ``image`` erlaubt, bereits gelesene Bytes mehrfach zu verwenden.
+        """
+        if image is None:
+            with open(firmware_path, 'rb') as firmware:
+                image = firmware.read()
+        logger.info(f"Flashe Firmware auf {self.name}: {firmware_path} ({len(image)} Bytes)")
+        self.flasher = FirmwareFlasher(self, image, progress=progress)
+        self.flash_report = self.flasher.report
+        try:
+            report = self.flasher.run()
+            logger.info(f"Firmware auf {self.name} geflasht: {report['duration']:.1f}s, "
+                        f"{report['throughput'] / 1024:.1f} KiB/s, {report['retransmits']} Wiederholungen")
+            return True
+        except FlashError as e:
+            logger.error(f"Flash fehlgeschlagen: {e}")
+            return False
+        finally:
+            self.flasher = None
+    
+    def _handle_flash(self, prefix, rest):
+        """Leitet Bootloader-Antworten an den laufenden Flash-Vorgang weiter"""
+        flasher = self.flasher
+        if flasher:
+            flasher.on_reply(prefix, rest)
 
 class GIGAConnection(HardwareConnection):
     """Arduino GIGA-spezifische Verbindungsklasse"""
     
-    def __init__(self, port=None):
+    def __init__(self, port=None, name=None):
         port = port or config.hardware['giga_port']
-        super().__init__(port, "Arduino GIGA")
+        super().__init__(port, name or "Arduino GIGA")
         self.udp_enabled = False
     
     def enable_udp_sender(self):
         """Aktiviert UDP-Sender Modus"""
-        return self.send_data("UDP_ENABLE")
+        return self.send_command("UDP_ENABLE")
     
     def disable_udp_sender(self):
         """Deaktiviert UDP-Sender Modus"""
-        return self.send_data("UDP_DISABLE")
+        return self.send_command("UDP_DISABLE")
     
-    def send_udp_signal(self, target_ip, signal_id, value):
-        """Sendet UDP-Signal über GIGA"""
-        command = f"UDP_SEND:{target_ip}:{signal_id}:{value}"
-        return self.send_data(command)
+    def send_udp_signal(self, target_ip, signal_id, value, block=True):
+        """Sendet UDP-Signal über GIGA (block=False: liefert ein Future)"""
+        return self.send_command("UDP_SEND", target_ip, signal_id, value, block=block)
 
 class HardwareManager:
     """Verwaltet alle Hardware-Verbindungen"""
     
-    def __init__(self):
+    def __init__(self, use_io_engine=None):
         self.connections = {}
-        self.data_queue = queue.Queue()
         self.running = False
         self.monitor_thread = None
+        self.data_queue = RingBuffer(
+            config.hardware['queue_capacity'],
+            config.hardware['queue_policy']
+        )
+        self.io_engine = None
+        self.connect_timings = {}
+        self.registry = DeviceRegistry()
+        self.groups = {}
+        self.last_broadcast = None
+        self.recorder = None
+        self.supervisor = None
+        self.telemetry = SensorColumns(config.hardware['telemetry_capacity'])
+        self.events = EventBus()
+        self.shadow = StateShadow(config.hardware['ack_timeout'])
+        # Bestätigungen der Boards pflegen den Zustands-Schatten
+        self.events.subscribe(self._on_reply, message_type='OK')
+        for message_type in ('CONNECT', 'DISCONNECT'):
+            self.events.subscribe(lambda device, _type, _status: self.shadow.invalidate(device),
+                                  message_type=message_type)
+        if use_io_engine if use_io_engine is not None else config.hardware['io_engine']:
+            self.enable_io_engine()
+    
+    def enable_io_engine(self):
+        """Aktiviert die gemeinsame I/O-Engine (ein Thread für alle Ports)"""
+        if not self.io_engine:
+            self.io_engine = SerialIOEngine()
+        return self.io_engine
+    
+    def _start_reading(self, connection):
+        """Startet das Lesen über die I/O-Engine oder einen eigenen Thread"""
+        if self.io_engine and self.io_engine.register(connection):
+            return True
+        return connection.start_reading()
     
-    def add_esp32(self, port, instance_number=1):
+    def add_esp32(self, port, instance_number=1, name=None):
         """Fügt eine ESP32-Verbindung hinzu"""
-        esp32 = ESP32Connection(port, instance_number)
-        self.connections[f"esp32_{instance_number}"] = esp32
-        return esp32
+        name = name or f"esp32_{instance_number}"
+        esp32 = ESP32Connection(port, instance_number, self._display_name(name, f"esp32_{instance_number}"))
+        return self._register(name, esp32)
     
-    def add_giga(self, port=None):
+    def add_giga(self, port=None, name="giga"):
         """Fügt eine GIGA-Verbindung hinzu"""
-        giga = GIGAConnection(port)
-        self.connections["giga"] = giga
-        return giga
+        giga = GIGAConnection(port, self._display_name(name, "giga"))
+        return self._register(name, giga)
     
-    def connect_all(self):
-        """Verbindet alle Hardware-Geräte"""
-        results = {}
+    def _display_name(self, name, standard_name):
+        """Anzeigename: Label aus der Registry, sonst der Gerätename
+        
+        Nur die Standard-Geräte (esp32_N, giga) behalten ohne Label die
+        bisherigen Namen "ESP32-N" bzw. "Arduino GIGA". Daten, Telemetrie und
+        Aufnahmen laufen immer über den eindeutigen Gerätenamen (device_id).
+        """
+        label = self.registry.devices.get(name, {}).get('label')
+        if label or name != standard_name:
+            return label or name
+        return None
+    
+    def add_device(self, name, kind, port=None):
+        """Fügt ein Gerät nach Typ ('esp32' oder 'giga') unter beliebigem Namen hinzu"""
+        if kind == 'giga':
+            return self.add_giga(port, name)
+        digits = name.rpartition('_')[2]
+        instance_number = int(digits) if digits.isdigit() else len(self.groups.get('esp32', ())) + 1
+        return self.add_esp32(port, instance_number, name)
+    
+    def load_registry(self, registry=None):
+        """Übernimmt eine DeviceRegistry (bzw. lädt data/devices.json) und indiziert die Gruppen neu"""
+        self.registry = registry if isinstance(registry, DeviceRegistry) else DeviceRegistry.load(registry)
+        self.groups = {}
         for name, connection in self.connections.items():
-            results[name] = connection.connect()
-            if results[name]:
-                connection.start_reading()
+            self._index(name, connection)
+        return self.registry
+    
+    def add_registry_devices(self):
+        """Legt alle Geräte der Registry mit ihren konfigurierten Ports an"""
+        return [self.add_device(name, spec['type'], spec.get('port'))
+                for name, spec in self.registry.devices.items()]
+    
+    def _index(self, name, connection):
+        """Trägt ein Gerät in 'all', seine Typ-Gruppe und die Registry-Gruppen ein"""
+        kind = 'esp32' if isinstance(connection, ESP32Connection) else 'giga'
+        for group in ('all', kind, *self.registry.groups_of(name)):
+            members = self.groups.setdefault(group, [])
+            if name not in members:
+                members.append(name)
+    
+    def get_group(self, group):
+        """Gerätenamen einer Gruppe (z.B. 'all', 'esp32', 'floor_2')"""
+        return list(self.groups.get(group, ()))
+    
+    def _register(self, name, connection):
+        """Nimmt eine Verbindung auf und hängt aktive Manager-Dienste an"""
+        connection.recorder = self.recorder
+        connection.telemetry = self.telemetry
+        connection.events = self.events
+        connection.shadow = self.shadow
+        connection.device_id = name
+        self.connections[name] = connection
+        self._index(name, connection)
+        return connection
+    
+    def connect_all(self, deadline=None, return_timings=False):
+        """Verbindet alle Hardware-Geräte parallel
+        
+        Geräte, die nach ``deadline`` Sekunden noch nicht fertig sind, verbinden
+        im Hintergrund weiter; ihr Ergebnis ist bis dahin None. Mit
+        ``return_timings`` wird zusätzlich die Verbindungsdauer je Gerät geliefert.
+        """
+        if deadline is None:
+            deadline = config.hardware['connect_deadline']
+        
+        results = {name: None for name in self.connections}
+        self.connect_timings = {name: None for name in self.connections}
+        
+        if self.connections:
+            executor = ThreadPoolExecutor(
+                max_workers=len(self.connections),
+                thread_name_prefix="HardwareConnect"
+            )
+            futures = {
+                executor.submit(self._connect_device, name, connection): name
+                for name, connection in self.connections.items()
+            }
+            done, pending = wait(futures, timeout=deadline)
+            for future in done:
+                results[futures[future]] = future.result()
+            for future in pending:
+                logger.warning(f"{futures[future]}: Verbindung nach {deadline}s noch offen - "
+                               f"wird im Hintergrund fortgesetzt")
+            # Nachzügler laufen weiter, blockieren den Aufrufer aber nicht
+            executor.shutdown(wait=False)
+        
+        if return_timings:
+            return results, dict(self.connect_timings)
         return results
     
+    def _connect_device(self, name, connection):
+        """Verbindet ein Gerät, startet das Lesen und misst die Dauer"""
+        if not connection.link_lock.acquire(blocking=False):
+            logger.debug(f"{name}: Verbindungsaufbau läuft bereits")
+            return False
+        started = time.monotonic()
+        try:
+            success = connection.connect()
+            if success:
+                self._activate(connection)
+        finally:
+            connection.link_lock.release()
+        self.connect_timings[name] = time.monotonic() - started
+        logger.debug(f"{name} nach {self.connect_timings[name]:.3f}s "
+                     f"{'verbunden' if success else 'fehlgeschlagen'}")
+        return success
+    
+    def _activate(self, connection):
+        """Startet nach (Re-)Connect das Lesen und gleicht die Board-Uhr neu ab"""
+        if not self._start_reading(connection):
+            return False
+        if config.hardware['clock_sync']:
+            connection.sync_clock()
+        return True
+    
+    def start_supervisor(self):
+        """Startet die automatische Überwachung mit Reconnect"""
+        if not self.supervisor:
+            self.supervisor = HardwareSupervisor(self)
+        self.supervisor.start()
+        return self.supervisor
+    
+    def get_link_stats(self):
+        """Reconnects und Ausfallzeiten je Gerät"""
+        if self.supervisor:
+            return self.supervisor.get_stats()
+        return {
+            name: {'reconnects': connection.reconnect_count, 'downtime': connection.downtime,
+                   'down': connection.down_since is not None, 'attempts': 0}
+            for name, connection in self.connections.items()
+        }
+    
     def disconnect_all(self):
         """Trennt alle Hardware-Verbindungen"""
         self.running = False
+        if self.supervisor:
+            self.supervisor.stop()
         for connection in self.connections.values():
             connection.disconnect()
+        if self.io_engine:
+            self.io_engine.stop()
+        self.stop_recording()
+        self.events.shutdown()
+    
+    def broadcast(self, command, names=None, deadline=None, group=None):
+        """Sendet einen Befehl gleichzeitig an mehrere Geräte
+        
+        ``command`` ist entweder der zu sendende Text oder eine Funktion, die
+        für eine Verbindung ein Future liefert (z.B. ``send_signal(..., block=False)``).
+        Alle Befehle werden zuerst eingereiht und laufen dann parallel über die
+        Writer-Threads; gewartet wird höchstens ``deadline`` Sekunden. Der
+        Bericht enthält den Versatz (skew) zwischen erstem und letztem Schreibende,
+        auch bei quittierten Befehlen; deren Round-Trip-Zeiten stehen getrennt
+        unter 'ack_rtt' (und im LatencyHistogram der Verbindung). Vom
+        Zustands-Schatten übersprungene Geräte stehen unter 'suppressed'.
+        ``group`` adressiert die Mitglieder einer Gruppe direkt über den Index.
+        """
+        if deadline is None:
+            deadline = config.hardware['broadcast_deadline']
+        if group is not None:
+            names = self.groups.get(group, ())
+        elif names is None:
+            names = list(self.connections)
+        
+        started = time.monotonic()
+        futures = {}
+        for name in names:
+            connection = self.connections.get(name)
+            if not connection:
+                continue
+            if callable(command):
+                futures[command(connection)] = name
+            else:
+                futures[connection.send_data_async(command)] = name
+        
+        done, pending = wait(futures, timeout=deadline)
+        sent, failed, suppressed = [], [], []
+        completed = []
+        ack_rtt = {}
+        for future in done:
+            if future.exception() is None and future.result() is None:
+                suppressed.append(futures[future])  # Board hatte den Zustand bereits
+            elif future.exception() is None:
+                sent.append(futures[future])
+                write_future = getattr(future, 'write_future', None)
+                if write_future is None:
+                    completed.append(future.result())
+                else:
+                    # Quittungs-Future liefert die RTT, der Versatz zählt ab Schreibende
+                    completed.append(write_future.result())
+                    ack_rtt[futures[future]] = future.result()
+            else:
+                failed.append(futures[future])
+        
+        report = {
+            'sent': sent,
+            'failed': failed,
+            'suppressed': suppressed,
+            'timed_out': [futures[future] for future in pending],
+            'skew': max(completed) - min(completed) if completed else None,
+            'ack_rtt': ack_rtt,
+            'duration': time.monotonic() - started
+        }
+        if report['timed_out']:
+            logger.warning(f"Broadcast-Deadline ({deadline}s) überschritten: {report['timed_out']}")
+        self.last_broadcast = report
+        return report
+    
+    def schedule_signal(self, signal_id, value=1, lead=None, at=None, names=None):
+        """Sendet ein Signal vorab an alle ESP32, die es zur selben Zeit ausführen
+        
+        Ausführungszeitpunkt ist ``at`` (time.monotonic) bzw. jetzt + ``lead``
+        Sekunden. Geräte ohne Uhren-Abgleich stehen im Bericht unter 'unsynced'.
+        """
+        when = at if at is not None else time.monotonic() + (lead or config.hardware['schedule_lead'])
+        if names is None:
+            names = self.groups.get('esp32', ())
+        synced = [name for name in names if self.connections[name].clock.synced]
+        
+        report = self.broadcast(
+            lambda connection: connection.send_signal_at(when, signal_id, value),
+            names=synced,
+            deadline=max(0.0, when - time.monotonic())
+        )
+        report['at'] = when
+        report['unsynced'] = [name for name in names if name not in synced]
+        if report['timed_out']:
+            logger.warning(f"Zeitgesteuertes Signal {signal_id} erreicht {report['timed_out']} "
+                           f"nicht vor dem Ausführungszeitpunkt")
+        return report
+    
+    def get_clock_stats(self):
+        """Uhren-Offset und Messlaufzeit je Gerät"""
+        return {name: connection.clock.get_stats() for name, connection in self.connections.items()}
+    
+    def start_recording(self, path):
+        """Zeichnet den Verkehr aller Verbindungen in eine Datei auf (None bei Fehler)"""
+        self.stop_recording()
+        try:
+            self.recorder = TrafficRecorder(path)
+        except OSError as e:
+            # Eine fehlende Aufnahme soll den Messestand nicht aufhalten
+            logger.error(f"Traffic-Aufnahme nicht möglich, fahre ohne fort: {e}")
+            return None
+        for connection in self.connections.values():
+            connection.recorder = self.recorder
+        return self.recorder
+    
+    def stop_recording(self):
+        """Beendet eine laufende Aufnahme"""
+        if not self.recorder:
+            return
+        for connection in self.connections.values():
+            connection.recorder = None
+        self.recorder.close()
+        self.recorder = None
     
     def get_connection(self, name):
         """Gibt eine spezifische Verbindung zurück"""
         return self.connections.get(name)
     
+    def _on_reply(self, device, message_type, entry):
+        """Übernimmt OK:SIGNAL:<id> als bestätigten Zustand"""
+        reply = entry.record
+        if reply and reply.command == 'SIGNAL' and reply.detail:
+            self.shadow.confirm(device, signal_key(reply.detail), reply.detail)
+    
+    def get_shadow_stats(self):
+        """Gesendete/unterdrückte Befehle und bestätigter Zustand je Gerät"""
+        stats = self.shadow.get_stats()
+        for device in stats:
+            stats[device]['state'] = self.shadow.get_state(device)
+        return stats
+    
+    def subscribe(self, callback, device=None, message_type=None, executor='io'):
+        """Abonniert Hardware-Nachrichten statt get_all_data zu pollen
+        
+        ``callback(device, message_type, event)`` erhält für Zeilen ein SerialLine
+        (z.B. message_type 'SENSOR', 'OK', 'ERR') und für Link-Ereignisse
+        'CONNECT'/'DISCONNECT' den Status. ``executor``: 'io' (I/O-Thread),
+        'pool' (Worker-Pool) oder ein TkExecutor für den Tk-Mainloop.
+        """
+        return self.events.subscribe(callback, device, message_type, executor)
+    
+    def unsubscribe(self, subscription):
+        """Meldet ein Abonnement ab"""
+        self.events.unsubscribe(subscription)
+    
     def get_all_data(self):
         """Sammelt Daten von allen Verbindungen"""
         all_data = []
         for connection in self.connections.values():
-            while not connection.data_queue.empty():
-                try:
-                    data = connection.data_queue.get_nowait()
-                    all_data.append(data)
-                except queue.Empty:
-                    break
+            all_data.extend(connection.data_queue.drain())
         return all_data
     
-    def get_status_summary(self):
-        """Gibt eine Übersicht aller Verbindungsstatus zurück"""
+    def flash_all(self, firmware_path, names=None, progress=None):
+        """Flasht alle (bzw. die genannten) ESP32 gleichzeitig
+        
+        Das Image wird nur einmal gelesen; jedes Board läuft in einem eigenen
+        Worker. Liefert {name: Bericht} mit Durchsatz, Dauer und Wiederholungen.
+        """
+        with open(firmware_path, 'rb') as firmware:
+            image = firmware.read()
+        targets = {
+            name: self.connections[name] for name in self.groups.get('esp32', ())
+            if names is None or name in names
+        }
+        if not targets:
+            return {}
+        
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix="Flash") as executor:
+            futures = {
+                name: executor.submit(connection.flash_firmware, firmware_path, progress, image)
+                for name, connection in targets.items()
+            }
+            results = {name: future.result() for name, future in futures.items()}
+        
+        ok = sum(results.values())
+        logger.info(f"Firmware auf {ok}/{len(targets)} Boards geflasht "
+                    f"({time.monotonic() - started:.1f}s gesamt)")
+        return {name: dict(targets[name].flash_report) for name in targets}
+    
+    def get_flash_status(self):
+        """Fortschritt des laufenden bzw. letzten Flash-Vorgangs je ESP32"""
+        return {
+            name: dict(connection.flash_report)
+            for name, connection in self.connections.items()
+            if getattr(connection, 'flash_report', None)
+        }
+    
+    def get_sensor_summary(self, last=None):
+        """Aggregierte Sensorwerte aller Geräte (aus dem Spaltenpuffer)"""
+        return self.telemetry.summary(last)
+    
+    def get_queue_stats(self):
+        """Füllstand und Überlauf-Zähler der Daten-Queues je Gerät (plus Sende-Statistik unter 'tx')"""
+        return {
+            name: dict(connection.data_queue.get_stats(), tx=connection.writer.get_stats())
+            for name, connection in self.connections.items()
+        }
+    
+    def get_status_summary(self, detailed=False):
+        """Gibt eine Übersicht aller Verbindungsstatus zurück
+        
+        Mit ``detailed`` enthält jeder Eintrag statt des Status-Strings ein Dict
+        mit Status, ausgehandelter Baudrate, Heartbeat-Lebendigkeit, Befehlslatenz (p50/p95/p99) und
+        Link-Statistik. Alle Werte sind zwischengespeichert; es findet kein I/O statt.
+        """
+        if not detailed:
+            return {
+                name: connection.status 
+                for name, connection in self.connections.items()
+            }
+        
+        link_stats = self.get_link_stats()
+        now = time.monotonic()
         return {
-            name: connection.status 
+            name: {
+                'status': connection.status,
+                'baud_rate': connection.baud_rate,
+                'baud_fallbacks': connection.baud_fallbacks,
+                **connection.get_liveness(now),
+                'latency': connection.get_latency_summary(),
+                'reconnects': link_stats[name]['reconnects'],
+                'downtime': link_stats[name]['downtime']
+            }
             for name, connection in self.connections.items()
         }
 
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+I/O-Engine für Dynamic Messe Stand V4
+Ein einzelner selectors-Thread multiplext alle seriellen Verbindungen
+"""
+
+import os
+import selectors
+import threading
+import time
+from core.logger import logger
+from core.config import config
+
+class SerialIOEngine:
+    """Liest alle registrierten Ports in genau einem Thread"""
+
+    def __init__(self, select_timeout=None):
+        self.select_timeout = select_timeout or config.hardware['select_timeout']
+        self.selector = selectors.DefaultSelector()
+        self.thread = None
+        self.running = False
+        self._lock = threading.Lock()
+        self._pending = []
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self.selector.register(self._wake_r, selectors.EVENT_READ)
+
+    def start(self):
+        """Startet den Engine-Thread (idempotent)"""
+        with self._lock:
+            if self.running:
+                return
+            self.running = True
+            self.thread = threading.Thread(target=self._loop, name="SerialIOEngine", daemon=True)
+            self.thread.start()
+        logger.info("Serial-I/O-Engine gestartet")
+
+    def stop(self):
+        """Stoppt den Engine-Thread und meldet alle Verbindungen ab"""
+        with self._lock:
+            if not self.running:
+                return
+            self.running = False
+        self._wake()
+        if self.thread and self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+        logger.info("Serial-I/O-Engine gestoppt")
+
+    def register(self, connection, handler=None):
+        """Registriert eine geöffnete Verbindung; handler erhält jede vollständige Zeile"""
+        fd = connection._fileno()
+        if fd is None:
+            return False
+        self.start()
+        self._submit('register', connection, handler or connection._handle_line)
+        connection.io_engine = self
+        return True
+
+    def unregister(self, connection):
+        """Meldet eine Verbindung ab und wartet, bis der Engine-Thread sie freigegeben hat"""
+        if connection.io_engine is not self:
+            return
+        connection.io_engine = None
+        done = self._submit('unregister', connection, None)
+        if self.running and threading.current_thread() is not self.thread:
+            done.wait(timeout=2)
+
+    def connection_count(self):
+        """Anzahl der aktuell registrierten Verbindungen"""
+        return len(self.selector.get_map()) - 1
+
+    def _submit(self, action, connection, handler):
+        """Reiht eine Selector-Änderung für den Engine-Thread ein"""
+        done = threading.Event()
+        with self._lock:
+            self._pending.append((action, connection, handler, done))
+        self._wake()
+        return done
+
+    def _wake(self):
+        """Weckt den Engine-Thread aus select()"""
+        try:
+            os.write(self._wake_w, b'\0')
+        except BlockingIOError:
+            pass  # Pipe ist bereits voll, der Thread wird ohnehin geweckt
+
+    def _apply_pending(self):
+        """Übernimmt Registrierungen im Engine-Thread"""
+        try:
+            while os.read(self._wake_r, 512):
+                pass
+        except BlockingIOError:
+            pass
+
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        for action, connection, handler, done in pending:
+            try:
+                if action == 'register':
+                    self._drop(connection)
+                    self.selector.register(connection._fileno(), selectors.EVENT_READ,
+                                           (connection, handler))
+                    logger.debug(f"{connection.name} bei I/O-Engine registriert")
+                else:
+                    self._drop(connection)
+            except Exception as e:
+                logger.error(f"Fehler bei I/O-Engine-Registrierung von {connection.name}: {e}")
+            finally:
+                done.set()
+
+    def _drop(self, connection):
+        """Entfernt eine Verbindung aus dem Selector, falls registriert"""
+        for key in list(self.selector.get_map().values()):
+            if key.data and key.data[0] is connection:
+                self.selector.unregister(key.fileobj)
+
+    def _loop(self):
+        """Haupt-Schleife: wartet auf lesbare Ports und verteilt Zeilen"""
+        while self.running:
+            try:
+                events = self.selector.select(self.select_timeout)
+            except Exception as e:
+                logger.error(f"Fehler in der I/O-Engine: {e}")
+                continue
+
+            for key, _mask in events:
+                if key.fileobj == self._wake_r:
+                    self._apply_pending()
+                    continue
+
+                connection, handler = key.data
+                try:
+                    connection._on_readable(handler)
+                except Exception as e:
+                    logger.error(f"Fehler beim Lesen von {connection.name}: {e}")
+                    self._drop(connection)
+                    connection.io_engine = None
+                    connection.status = "error"
+
+            # Heartbeats laufen im Engine-Thread mit, nie im Tk-Thread
+            now = time.monotonic()
+            for key in list(self.selector.get_map().values()):
+                if key.data:
+                    key.data[0]._heartbeat_tick(now)
+
+        # Offene Abmeldungen quittieren und alle Ports freigeben
+        self._apply_pending()
+        for key in list(self.selector.get_map().values()):
+            if key.data:
+                key.data[0].io_engine = None
+                self.selector.unregister(key.fileobj)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Metriken für Dynamic Messe Stand V4
+Latenz-Histogramme mit festen Buckets für Hardware-Befehle
+"""
+
+import bisect
+import threading
+
+# Obergrenzen in Sekunden: 0,1 ms bis ~6,5 s, vier Buckets pro Verdopplung
+DEFAULT_BOUNDS = tuple(0.0001 * 2 ** (i / 4) for i in range(65))
+
+class LatencyHistogram:
+    """Histogramm mit festen Buckets; Perzentile werden aus den Bucket-Grenzen geschätzt"""
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # letzter Bucket: Überlauf
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        """Erfasst einen Messwert in Sekunden"""
+        index = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if self.minimum is None or seconds < self.minimum:
+                self.minimum = seconds
+            if self.maximum is None or seconds > self.maximum:
+                self.maximum = seconds
+
+    def percentile(self, fraction):
+        """Obergrenze des Buckets, in dem das Perzentil liegt (None ohne Messwerte)"""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = fraction * self.count
+            seen = 0
+            for index, bucket_count in enumerate(self.counts):
+                seen += bucket_count
+                if seen >= rank and bucket_count:
+                    if index < len(self.bounds):
+                        return min(self.bounds[index], self.maximum)
+                    return self.maximum
+            return self.maximum
+
+    def summary(self):
+        """Kennzahlen in Millisekunden für Status-Anzeigen"""
+        def ms(value):
+            return round(value * 1000, 3) if value is not None else None
+
+        return {
+            'count': self.count,
+            'mean_ms': ms(self.total / self.count) if self.count else None,
+            'p50_ms': ms(self.percentile(0.50)),
+            'p95_ms': ms(self.percentile(0.95)),
+            'p99_ms': ms(self.percentile(0.99)),
+            'max_ms': ms(self.maximum)
+        }
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Traffic-Recorder für Dynamic Messe Stand V4
+Zeichnet den seriellen Verkehr kompakt auf und spielt ihn deterministisch wieder ab
+"""
+
+import os
+import struct
+import threading
+import time
+from core.logger import logger
+
+MAGIC = b'MSTREC1\n'
+HEADER = struct.Struct('<q')        # Startzeit der Aufnahme (time.time_ns)
+RECORD = struct.Struct('<qBBH')     # ns seit Start, Typ, Geräte-ID, Payload-Länge
+
+DEVICE = 0
+INBOUND = 1
+OUTBOUND = 2
+CONNECT = 3
+DISCONNECT = 4
+
+EVENT_NAMES = {
+    DEVICE: 'device',
+    INBOUND: 'in',
+    OUTBOUND: 'out',
+    CONNECT: 'connect',
+    DISCONNECT: 'disconnect',
+}
+
+class TrafficRecorder:
+    """Schreibt zeitgestempelte Ereignisse in ein binäres Append-only-Log
+
+    Gerätenamen werden einmalig als DEVICE-Eintrag abgelegt und danach nur
+    noch über ihre ID (u8) referenziert.
+    """
+
+    def __init__(self, path, flush_interval=1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._devices = {}
+        self.records = 0
+
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new_file:
+            raise FileExistsError(f"Aufnahme {path} existiert bereits")
+        self._file = open(path, 'ab')
+        self._start_ns = time.monotonic_ns()
+        self._file.write(MAGIC + HEADER.pack(time.time_ns()))
+        self._last_flush = time.monotonic()
+        logger.info(f"Traffic-Aufnahme gestartet: {path}")
+
+    def record(self, event, device, payload=b''):
+        """Hängt ein Ereignis an (thread-sicher)"""
+        with self._lock:
+            if self._file is None:
+                return
+            device_id = self._devices.get(device)
+            if device_id is None:
+                device_id = self._register_device(device)
+            now = time.monotonic_ns()
+            payload = payload[:0xFFFF]
+            self._file.write(RECORD.pack(now - self._start_ns, event, device_id, len(payload)))
+            self._file.write(payload)
+            self.records += 1
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._file.flush()
+                self._last_flush = time.monotonic()
+
+    def _register_device(self, device):
+        device_id = len(self._devices)
+        if device_id > 0xFF:
+            raise ValueError("Zu viele Geräte für eine Aufnahme (max. 256)")
+        self._devices[device] = device_id
+        name = device.encode('utf-8')
+        self._file.write(RECORD.pack(time.monotonic_ns() - self._start_ns, DEVICE, device_id, len(name)))
+        self._file.write(name)
+        return device_id
+
+    def close(self):
+        """Schließt die Aufnahme"""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+        logger.info(f"Traffic-Aufnahme beendet: {self.path} ({self.records} Einträge)")
+
+def read_records(path):
+    """Liefert (ns seit Start, Typ, Gerätename, Payload) für jeden Eintrag"""
+    devices = {}
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} ist keine Traffic-Aufnahme")
+        f.read(HEADER.size)
+        while True:
+            head = f.read(RECORD.size)
+            if len(head) < RECORD.size:
+                return  # Ende bzw. abgeschnittener letzter Eintrag
+            offset_ns, event, device_id, length = RECORD.unpack(head)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            if event == DEVICE:
+                devices[device_id] = payload.decode('utf-8')
+                continue
+            yield offset_ns, event, devices.get(device_id, f"#{device_id}"), payload
+
+class TrafficReplayer:
+    """Spielt eine Aufnahme in einen HardwareManager ein
+
+    Eingehende Zeilen landen über ``_handle_line`` in den Verbindungen, als
+    kämen sie vom Board. ``speed`` 1.0 entspricht Echtzeit, N beschleunigt
+    N-fach, None spielt so schnell wie möglich ab.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def replay(self, manager, speed=1.0):
+        """Spielt ab und liefert eine Statistik"""
+        connections = manager.connections
+        stats = {'records': 0, 'inbound': 0, 'skipped': 0, 'duration': 0.0, 'throughput': 0.0}
+
+        started = time.monotonic()
+        first_ns = None
+        for offset_ns, event, device, payload in read_records(self.path):
+            stats['records'] += 1
+            if event != INBOUND:
+                continue
+            connection = connections.get(device)
+            if connection is None:
+                stats['skipped'] += 1
+                continue
+            if first_ns is None:
+                first_ns = offset_ns
+            if speed:
+                delay = (offset_ns - first_ns) / 1e9 / speed - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            connection._handle_line(memoryview(payload))
+            stats['inbound'] += 1
+
+        stats['duration'] = time.monotonic() - started
+        if stats['duration'] > 0:
+            stats['throughput'] = stats['inbound'] / stats['duration']
+        logger.info(f"Replay {self.path}: {stats['inbound']} Zeilen in {stats['duration']:.2f}s")
+        return stats
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Geräte-Registry für Dynamic Messe Stand V4
+Deklarative Geräteliste mit Gruppen aus data/devices.json
+"""
+
+import json
+import os
+from core.logger import logger
+from core.config import config
+
+# Beispiel data/devices.json:
+# {
+#   "devices": {
+#     "esp32_1": {"type": "esp32", "port": "/dev/ttyUSB0", "serial": "0001A2B3",
+#                 "label": "ESP32-1", "groups": ["lights", "floor_1"]},
+#     "giga":    {"type": "giga",  "port": "/dev/ttyACM0"}
+#   },
+#   "groups": {"all lights": ["esp32_1"]}
+# }
+DEVICE_TYPES = ('esp32', 'giga')
+
+class DeviceRegistry:
+    """Geräte mit Typ, Port, Seriennummer und Gruppen
+
+    Ohne Datei entspricht die Registry der bisherigen festen Verdrahtung
+    (esp32_1..3 und giga aus ``config.hardware``).
+    """
+
+    def __init__(self, devices=None, groups=None):
+        self.devices = dict(devices or {})
+        self.groups = {name: list(members) for name, members in (groups or {}).items()}
+        for name, spec in self.devices.items():
+            if spec.get('type') not in DEVICE_TYPES:
+                raise ValueError(f"Gerät {name}: unbekannter Typ {spec.get('type')!r}")
+            for group in spec.get('groups', ()):
+                self.groups.setdefault(group, [])
+                if name not in self.groups[group]:
+                    self.groups[group].append(name)
+
+    @classmethod
+    def load(cls, path=None):
+        """Lädt die Registry aus JSON bzw. liefert die Standard-Verdrahtung"""
+        path = path or config.hardware['device_registry']
+        if not os.path.exists(path):
+            return cls.default()
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        registry = cls(data.get('devices'), data.get('groups'))
+        logger.info(f"Geräte-Registry geladen: {len(registry.devices)} Geräte, "
+                    f"{len(registry.groups)} Gruppen ({path})")
+        return registry
+
+    @classmethod
+    def default(cls):
+        devices = {
+            f"esp32_{n}": {'type': 'esp32', 'port': config.hardware[f"esp32_{n}_port"], 'label': f"ESP32-{n}"}
+            for n in (1, 2, 3)
+        }
+        devices['giga'] = {'type': 'giga', 'port': config.hardware['giga_port'], 'label': 'Arduino GIGA'}
+        return cls(devices)
+
+    def label(self, name):
+        """Anzeigename eines Geräts"""
+        return self.devices.get(name, {}).get('label', name)
+
+    def names_of_type(self, kind):
+        return [name for name, spec in self.devices.items() if spec['type'] == kind]
+
+    def groups_of(self, name):
+        """Deklarierte Gruppen eines Geräts"""
+        return [group for group, members in self.groups.items() if name in members]
+
+    def serials(self):
+        """{Name: Seriennummer} für die Port-Erkennung"""
+        return {name: spec['serial'] for name, spec in self.devices.items() if spec.get('serial')}
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Ring-Puffer für Dynamic Messe Stand V4
+Begrenzte, vorallokierte Daten-Queue mit Überlauf-Statistik
+"""
+
+import queue
+import threading
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+
+class RingBuffer:
+    """Thread-sichere Queue fester Größe (Teilmenge der queue.Queue-API)
+
+    Bei vollem Puffer wird je nach policy der älteste Eintrag überschrieben
+    (drop_oldest) oder der neue verworfen (drop_newest).
+    """
+
+    def __init__(self, capacity=1024, policy=DROP_OLDEST):
+        if capacity < 1:
+            raise ValueError("capacity muss mindestens 1 sein")
+        if policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unbekannte Überlauf-Policy: {policy}")
+        self.capacity = capacity
+        self.policy = policy
+        self._slots = [None] * capacity
+        self._head = 0
+        self._size = 0
+        self._not_empty = threading.Condition(threading.Lock())
+        self.enqueued = 0
+        self.dropped = 0
+        self.high_water = 0
+
+    def put(self, item, block=True, timeout=None):
+        """Legt einen Eintrag ab; blockiert nie (block/timeout nur für API-Kompatibilität)"""
+        with self._not_empty:
+            if self._size == self.capacity:
+                self.dropped += 1
+                if self.policy == DROP_NEWEST:
+                    return False
+                # Ältesten Eintrag überschreiben
+                self._slots[self._head] = item
+                self._head = (self._head + 1) % self.capacity
+            else:
+                self._slots[(self._head + self._size) % self.capacity] = item
+                self._size += 1
+                if self._size > self.high_water:
+                    self.high_water = self._size
+            self.enqueued += 1
+            self._not_empty.notify()
+            return True
+
+    put_nowait = put
+
+    def get(self, block=True, timeout=None):
+        """Entnimmt den ältesten Eintrag; wirft queue.Empty wie queue.Queue"""
+        with self._not_empty:
+            if block:
+                if not self._not_empty.wait_for(lambda: self._size, timeout):
+                    raise queue.Empty
+            elif not self._size:
+                raise queue.Empty
+            return self._pop()
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def drain(self, limit=None):
+        """Entnimmt alle (bzw. höchstens limit) Einträge in einem Lock-Durchlauf"""
+        with self._not_empty:
+            count = self._size if limit is None else min(limit, self._size)
+            return [self._pop() for _ in range(count)]
+
+    def _pop(self):
+        item = self._slots[self._head]
+        self._slots[self._head] = None
+        self._head = (self._head + 1) % self.capacity
+        self._size -= 1
+        return item
+
+    def qsize(self):
+        return self._size
+
+    def empty(self):
+        return not self._size
+
+    def full(self):
+        return self._size == self.capacity
+
+    def get_stats(self):
+        """Zähler für die Dimensionierung des Puffers"""
+        with self._not_empty:
+            return {
+                'capacity': self.capacity,
+                'policy': self.policy,
+                'size': self._size,
+                'enqueued': self.enqueued,
+                'dropped': self.dropped,
+                'high_water': self.high_water
+            }
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Zustands-Schatten für Dynamic Messe Stand V4
+Merkt sich den bestätigten Zustand je Gerät, um redundante Befehle zu sparen
+"""
+
+import threading
+import time
+from collections import Counter
+
+def signal_key(signal_id):
+    """Zustands-Schlüssel eines Signals: 'page_3' -> 'page'"""
+    return signal_id.rsplit('_', 1)[0]
+
+class StateShadow:
+    """Letzter gesendeter bzw. vom Board bestätigter Zustand je (Gerät, Schlüssel)
+
+    Ein Befehl wird unterdrückt, wenn das Board den Zielzustand bereits
+    bestätigt hat oder derselbe Befehl noch unbestätigt unterwegs ist (höchstens
+    ``pending_timeout`` Sekunden lang). Verbindungsabbrüche und Schreibfehler
+    verwerfen den Schatten, danach wird wieder gesendet.
+    """
+
+    def __init__(self, pending_timeout=1.0):
+        self.pending_timeout = pending_timeout
+        self._states = {}
+        self._lock = threading.Lock()
+        self.sent = Counter()
+        self.suppressed = Counter()
+
+    def should_send(self, device, key, value, force=False, now=None):
+        """Prüft und vermerkt einen Befehl; False = Board hat den Zustand schon"""
+        now = now or time.monotonic()
+        with self._lock:
+            entry = self._states.get((device, key))
+            if not force and entry and entry[0] == value and (entry[1] or now - entry[2] < self.pending_timeout):
+                self.suppressed[device] += 1
+                return False
+            self._states[(device, key)] = (value, False, now)
+            self.sent[device] += 1
+            return True
+
+    def confirm(self, device, key, signal_id):
+        """Übernimmt eine Bestätigung des Boards (z.B. OK:SIGNAL:page_3)"""
+        with self._lock:
+            entry = self._states.get((device, key))
+            if entry and entry[0][0] == signal_id:
+                value = entry[0]
+            elif entry and not entry[1]:
+                return  # Antwort auf einen älteren Befehl, ein neuerer ist noch unterwegs
+            else:
+                value = (signal_id, None)  # Zustand von anderer Seite geändert, Wert unbekannt
+            self._states[(device, key)] = (value, True, time.monotonic())
+
+    def invalidate(self, device=None, key=None):
+        """Verwirft den Schatten eines Geräts (bzw. eines Schlüssels oder alles)"""
+        with self._lock:
+            for state_key in list(self._states):
+                if (device is None or state_key[0] == device) and (key is None or state_key[1] == key):
+                    del self._states[state_key]
+
+    def get_state(self, device):
+        """Bestätigte Zustände eines Geräts als {Schlüssel: Signal}"""
+        with self._lock:
+            return {
+                key: value[0]
+                for (state_device, key), (value, confirmed, _) in self._states.items()
+                if state_device == device and confirmed
+            }
+
+    def get_stats(self):
+        """Gesendete und unterdrückte Befehle je Gerät"""
+        with self._lock:
+            devices = set(self.sent) | set(self.suppressed)
+            return {
+                device: {'sent': self.sent[device], 'suppressed': self.suppressed[device]}
+                for device in devices
+            }
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Frame-Streaming für Dynamic Messe Stand V4
+LED-Frames mit fester Bildrate an einen ESP32, doppelt gepuffert
+"""
+
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from core.logger import logger
+from core.config import config
+from models.writer import BULK
+
+try:
+    import numpy as np
+except ImportError:  # NumPy ist optional, bytearray-Puffer genügen
+    np = None
+
+# Roh-Frame: 0xA6 | Seq (u16) | Länge (u16) | Pixeldaten | CRC32 (u32) über die Pixeldaten, alles LE
+FRAME_SYNC = 0xA6
+FRAME_HEADER = struct.Struct('<BHH')
+FRAME_CRC = struct.Struct('<I')
+
+class FrameStreamer:
+    """Sendet Frames fester Größe mit ``fps`` Bildern pro Sekunde
+
+    Der Produzent übergibt mit ``submit`` ein beliebiges Buffer-Objekt
+    (bytes, bytearray, NumPy-Array) - es wird nur referenziert, nicht kopiert,
+    und darf danach nicht mehr verändert werden. Alternativ liefert
+    ``acquire`` einen der beiden vorallokierten Puffer zum Befüllen, den
+    ``publish`` freigibt; hält der Writer beide noch, liefert ``acquire`` None
+    und der Produzent lässt diesen Frame aus. Pro Takt geht höchstens der neueste Frame hinaus;
+    ist der vorige noch nicht geschrieben, wartet er auf den nächsten Takt und
+    wird von einem neueren Frame verdrängt statt eingereiht zu werden.
+    """
+
+    def __init__(self, connection, frame_size, fps=None):
+        self.connection = connection
+        self.frame_size = frame_size
+        self.fps = fps or config.hardware['stream_fps']
+        self.period = 1.0 / self.fps
+        self._buffers = [bytearray(frame_size), bytearray(frame_size)]
+        self._back = 0
+        self._pending = None
+        self._pending_index = None
+        self._in_flight = None
+        self._sending = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.thread = None
+        self._last_write = None
+        self._seq = 0
+        self._sent_times = deque()
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.dropped = 0
+        self.late_ticks = 0
+        self.missed_ticks = 0
+
+        wire_rate = (frame_size + FRAME_HEADER.size + FRAME_CRC.size) * self.fps
+        if wire_rate > connection.baud_rate / 10:
+            logger.warning(f"{connection.name}: {wire_rate} B/s Frame-Daten übersteigen "
+                           f"{connection.baud_rate} Baud - Frames werden verworfen")
+
+    def start(self):
+        """Startet den Sende-Takt"""
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._loop, name=f"Stream-{self.connection.name}", daemon=True)
+        self.thread.start()
+        logger.info(f"Frame-Stream für {self.connection.name}: {self.frame_size} Bytes @ {self.fps} fps")
+
+    def stop(self):
+        self._stop.set()
+        if self.thread and self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+
+    def submit(self, frame):
+        """Übergibt einen fertigen Frame (Buffer-Protokoll, ohne Kopie)"""
+        try:
+            view = memoryview(frame).cast('B')
+        except TypeError:
+            raise ValueError("Frame muss ein zusammenhängender Puffer sein")
+        if view.nbytes != self.frame_size:
+            raise ValueError(f"Frame hat {view.nbytes} Bytes, erwartet {self.frame_size}")
+        with self._lock:
+            if self._pending is not None:
+                self.dropped += 1  # verdrängt, bevor er gesendet wurde
+            self._pending = view
+            self._pending_index = None
+
+    def acquire(self):
+        """Freier Puffer zum Befüllen (NumPy-uint8-Sicht, falls verfügbar)
+        
+        Wird der Puffer noch geschrieben, wartet acquire höchstens einen Takt darauf
+        und liefert danach None - der Frame ist dann auszulassen.
+        """
+        deadline = time.monotonic() + self.period
+        while True:
+            with self._lock:
+                index = self._back
+                busy = self._buffer_busy(index)
+                in_flight = self._in_flight
+            if not busy:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                with self._lock:
+                    self.dropped += 1
+                return None
+            if in_flight and in_flight[0] == index:
+                try:
+                    in_flight[1].result(timeout=remaining)
+                except Exception:
+                    pass  # Schreibfehler oder Timeout - oben erneut prüfen
+            else:
+                time.sleep(min(remaining, 0.001))  # Frame wird gerade eingereiht
+        buffer = self._buffers[index]
+        if np is not None:
+            return np.frombuffer(buffer, dtype=np.uint8)
+        return memoryview(buffer)
+
+    def _buffer_busy(self, index):
+        """Puffer wartet noch auf den Versand oder steckt im Writer (mit _lock)"""
+        if self._pending is not None and self._pending_index == index:
+            return True
+        if self._sending == index:
+            return True
+        in_flight = self._in_flight
+        return in_flight is not None and in_flight[0] == index and not in_flight[1].done()
+
+    def publish(self):
+        """Gibt den mit ``acquire`` befüllten Puffer frei und wechselt auf den anderen"""
+        with self._lock:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = memoryview(self._buffers[self._back])
+            self._pending_index = self._back
+            # Der andere Puffer ist frei, sobald sein letzter Frame geschrieben ist
+            self._back ^= 1
+
+    def _loop(self):
+        started = time.monotonic()
+        tick = 0
+        while not self._stop.is_set():
+            tick += 1
+            deadline = started + tick * self.period
+            now = time.monotonic()
+            if now > deadline + self.period:
+                # Ganze Takte verpasst: neu ausrichten statt nachzuholen
+                skipped = int((now - deadline) / self.period)
+                self.missed_ticks += skipped
+                tick += skipped
+                deadline = started + tick * self.period
+            if self._stop.wait(max(0.0, deadline - time.monotonic())):
+                break
+            self._send_tick()
+
+    def _send_tick(self):
+        with self._lock:
+            frame, self._pending = self._pending, None
+            index = self._sending = self._pending_index
+        if frame is None:
+            return  # kein neuer Frame, LEDs behalten den letzten Stand
+        if self._last_write is not None and not self._last_write.done():
+            # Voriger Frame hängt noch im Writer: nicht stapeln, im nächsten Takt erneut versuchen
+            self.late_ticks += 1
+            with self._lock:
+                if self._pending is None:
+                    self._pending, self._pending_index = frame, index
+                else:
+                    self.dropped += 1
+                self._sending = None
+            return
+
+        self._seq = (self._seq + 1) & 0xFFFF
+        # Kopf, Pixel und CRC als ein Eintrag: kein Steuerbefehl kann dazwischen geraten
+        parts = (
+            FRAME_HEADER.pack(FRAME_SYNC, self._seq, self.frame_size),
+            frame,
+            FRAME_CRC.pack(zlib.crc32(frame))
+        )
+        self._last_write = self.connection._submit(parts, description="FRAME", priority=BULK)
+        with self._lock:
+            self._in_flight = (index, self._last_write) if index is not None else None
+            self._sending = None
+
+        now = time.monotonic()
+        self.frames_sent += 1
+        self.bytes_sent += self.frame_size + FRAME_HEADER.size + FRAME_CRC.size
+        self._sent_times.append(now)
+        while self._sent_times and now - self._sent_times[0] > 1.0:
+            self._sent_times.popleft()
+
+    def get_stats(self):
+        """Erreichte Bildrate und Datenrate der letzten Sekunde"""
+        now = time.monotonic()
+        fps = sum(1 for sent in list(self._sent_times) if now - sent <= 1.0)
+        return {
+            'fps_target': self.fps,
+            'fps': fps,
+            'bytes_per_s': fps * (self.frame_size + FRAME_HEADER.size + FRAME_CRC.size),
+            'frames_sent': self.frames_sent,
+            'bytes_sent': self.bytes_sent,
+            'dropped': self.dropped,
+            'late_ticks': self.late_ticks,
+            'missed_ticks': self.missed_ticks
+        }
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Verbindungs-Supervisor für Dynamic Messe Stand V4
+Erkennt abgerissene Hardware-Links und verbindet mit exponentiellem Backoff neu
+"""
+
+import random
+import threading
+import time
+from core.logger import logger
+from core.config import config
+
+class HardwareSupervisor:
+    """Überwacht alle Verbindungen eines HardwareManagers
+
+    Eine Verbindung gilt als gestört, wenn ihr Port geschlossen ist oder
+    Reader- bzw. Writer-Thread nicht mehr laufen. Neuverbindungen erfolgen
+    mit ``base * 2^Versuch`` Sekunden Abstand (gedeckelt auf ``max_delay``,
+    ±50 % Jitter), eingereihte Befehle werden danach weiter gesendet.
+    """
+
+    def __init__(self, manager, interval=None, base_delay=None, max_delay=None):
+        self.manager = manager
+        self.interval = interval or config.hardware['supervisor_interval']
+        self.base_delay = base_delay or config.hardware['reconnect_base_delay']
+        self.max_delay = max_delay or config.hardware['reconnect_max_delay']
+        self.thread = None
+        self.running = False
+        self._stop_event = threading.Event()
+        self._attempts = {}
+        self._next_attempt = {}
+        self._rng = random.Random()
+
+    def start(self):
+        """Startet die Überwachung"""
+        if self.running:
+            return
+        self.running = True
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._loop, name="HardwareSupervisor", daemon=True)
+        self.thread.start()
+        logger.info("Hardware-Supervisor gestartet")
+
+    def stop(self):
+        """Beendet die Überwachung (vor dem Trennen aufrufen, sonst wird neu verbunden)"""
+        if not self.running:
+            return
+        self.running = False
+        self._stop_event.set()
+        if self.thread and self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join(timeout=5)
+        logger.info("Hardware-Supervisor gestoppt")
+
+    def backoff_delay(self, attempt):
+        """Wartezeit vor dem nächsten Versuch (mit Jitter)"""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * self._rng.uniform(0.5, 1.5)
+
+    def _loop(self):
+        while not self._stop_event.wait(self.interval):
+            for name, connection in list(self.manager.connections.items()):
+                if not self.running:
+                    break
+                try:
+                    self._check(name, connection)
+                except Exception as e:
+                    logger.error(f"Supervisor-Fehler bei {name}: {e}")
+
+    def _check(self, name, connection):
+        """Prüft eine Verbindung und stößt bei Bedarf einen Reconnect an"""
+        now = time.monotonic()
+        if connection.is_healthy():
+            if connection.down_since is not None:
+                # Verbindung ist (z.B. durch einen Nachzügler aus connect_all) wieder da
+                self._mark_up(name, connection, now)
+            return
+        if connection.connecting:
+            return
+
+        if connection.down_since is None:
+            connection.down_since = now
+            self._attempts[name] = 0
+            self._next_attempt[name] = now
+            logger.warning(f"{name}: Verbindung gestört (Status: {connection.status})")
+
+        if now < self._next_attempt.get(name, now):
+            return
+
+        if not connection.link_lock.acquire(blocking=False):
+            return  # Verbindungsaufbau läuft bereits an anderer Stelle
+        try:
+            attempt = self._attempts.get(name, 0)
+            logger.info(f"{name}: Reconnect-Versuch {attempt + 1}")
+            success = connection.reconnect() and self.manager._activate(connection)
+        finally:
+            connection.link_lock.release()
+        if success:
+            connection.reconnect_count += 1
+            self._mark_up(name, connection, time.monotonic())
+        else:
+            connection.status = "reconnecting"
+            self._attempts[name] = attempt + 1
+            delay = self.backoff_delay(attempt)
+            self._next_attempt[name] = time.monotonic() + delay
+            logger.debug(f"{name}: nächster Versuch in {delay:.1f}s")
+
+    def retry_now(self, name):
+        """Setzt den Backoff zurück, damit der nächste Durchlauf sofort neu verbindet"""
+        self._attempts[name] = 0
+        self._next_attempt[name] = time.monotonic()
+
+    def _mark_up(self, name, connection, now):
+        outage = now - connection.down_since
+        connection.downtime += outage
+        connection.down_since = None
+        self._attempts.pop(name, None)
+        self._next_attempt.pop(name, None)
+        logger.info(f"{name}: wieder verbunden nach {outage:.1f}s "
+                    f"({connection.reconnect_count} Reconnects gesamt)")
+
+    def get_stats(self):
+        """Reconnects und Ausfallzeit je Gerät"""
+        now = time.monotonic()
+        return {
+            name: {
+                'reconnects': connection.reconnect_count,
+                'downtime': connection.downtime + (now - connection.down_since
+                                                   if connection.down_since is not None else 0.0),
+                'down': connection.down_since is not None,
+                'attempts': self._attempts.get(name, 0)
+            }
+            for name, connection in self.manager.connections.items()
+        }
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Telemetrie für Dynamic Messe Stand V4
+Typisierte Board-Nachrichten über eine Dispatch-Tabelle und spaltenweise Sensorpuffer
+"""
+
+import threading
+from array import array
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy ist optional, array reicht für die Aggregation
+    np = None
+
+SensorReading = namedtuple('SensorReading', 'timestamp source sensor value')
+CommandReply = namedtuple('CommandReply', 'timestamp source ok command detail')
+StatusMessage = namedtuple('StatusMessage', 'timestamp source key value')
+LogMessage = namedtuple('LogMessage', 'timestamp source level text')
+
+def _parse_sensor(timestamp, source, prefix, rest):
+    # SENSOR:<name>:<wert>
+    sensor, _, value = rest.partition(b':')
+    return SensorReading(timestamp, source, sensor.decode('ascii', 'replace'), float(value))
+
+def _parse_reply(timestamp, source, prefix, rest):
+    # OK:<befehl>[:<detail>] bzw. ERR:<befehl>[:<detail>]
+    command, _, detail = rest.partition(b':')
+    return CommandReply(timestamp, source, prefix == b'OK',
+                        command.decode('ascii', 'replace'), detail.decode('utf-8', 'replace'))
+
+def _parse_status(timestamp, source, prefix, rest):
+    # STATUS:<schlüssel>:<wert>
+    key, _, value = rest.partition(b':')
+    return StatusMessage(timestamp, source, key.decode('ascii', 'replace'), value.decode('utf-8', 'replace'))
+
+def _parse_log(timestamp, source, prefix, rest):
+    # LOG:<level>:<text>
+    level, _, text = rest.partition(b':')
+    return LogMessage(timestamp, source, level.decode('ascii', 'replace'), text.decode('utf-8', 'replace'))
+
+# Präfix (Bytes bis zum ersten ':') -> Parser; ein Dict-Lookup pro Zeile
+PARSERS = {
+    b'SENSOR': _parse_sensor,
+    b'OK': _parse_reply,
+    b'ERR': _parse_reply,
+    b'STATUS': _parse_status,
+    b'LOG': _parse_log,
+}
+
+def message_type(raw):
+    """Präfix einer Rohzeile als str (z.B. 'SENSOR'), ohne die ganze Zeile zu dekodieren"""
+    return raw.partition(b':')[0].decode('ascii', 'replace')
+
+def parse_line(timestamp, source, raw):
+    """Zerlegt eine Rohzeile in einen typisierten Datensatz (None bei unbekanntem Präfix)"""
+    prefix, _, rest = raw.partition(b':')
+    parser = PARSERS.get(prefix)
+    if parser is None:
+        return None
+    try:
+        return parser(timestamp, source, prefix, rest)
+    except ValueError:
+        return None  # z.B. nicht-numerischer Sensorwert
+
+class _Column:
+    """Ring aus Zeitstempeln und Werten für eine Sensor-Reihe"""
+
+    __slots__ = ('timestamps', 'values', 'head', 'size')
+
+    def __init__(self, capacity):
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity))
+        self.head = 0
+        self.size = 0
+
+class SensorColumns:
+    """Spaltenweiser Puffer fester Größe für Sensorwerte je (Gerät, Sensor)
+
+    Werte liegen in vorallokierten ``array('d')``-Ringen; Aggregation und
+    Plot-Daten kommen ohne Objekt-Allokation pro Messwert aus.
+    """
+
+    def __init__(self, capacity=3600):
+        self.capacity = capacity
+        self._columns = {}
+        self._lock = threading.Lock()
+
+    def append(self, reading):
+        """Fügt einen SensorReading an"""
+        key = (reading.source, reading.sensor)
+        with self._lock:
+            column = self._columns.get(key)
+            if column is None:
+                column = self._columns[key] = _Column(self.capacity)
+            index = (column.head + column.size) % self.capacity
+            column.timestamps[index] = reading.timestamp
+            column.values[index] = reading.value
+            if column.size < self.capacity:
+                column.size += 1
+            else:
+                column.head = (column.head + 1) % self.capacity
+
+    def keys(self):
+        with self._lock:
+            return list(self._columns)
+
+    def series(self, source, sensor, last=None):
+        """(Zeitstempel, Werte) in zeitlicher Reihenfolge als array('d') bzw. NumPy-Arrays"""
+        with self._lock:
+            column = self._columns.get((source, sensor))
+            if column is None:
+                return array('d'), array('d')
+            count = column.size if last is None else min(last, column.size)
+            start = (column.head + column.size - count) % self.capacity
+            timestamps = self._unroll(column.timestamps, start, count)
+            values = self._unroll(column.values, start, count)
+        if np is not None:
+            return np.frombuffer(timestamps, dtype=np.float64), np.frombuffer(values, dtype=np.float64)
+        return timestamps, values
+
+    def _unroll(self, ring, start, count):
+        end = start + count
+        if end <= self.capacity:
+            return ring[start:end]
+        return ring[start:] + ring[:end - self.capacity]
+
+    def summary(self, last=None):
+        """min/max/Mittelwert/letzter Wert je Reihe"""
+        result = {}
+        for source, sensor in self.keys():
+            _, values = self.series(source, sensor, last)
+            if not len(values):
+                continue
+            result[f"{source}/{sensor}"] = {
+                'count': len(values),
+                'last': values[-1],
+                'min': min(values),
+                'max': max(values),
+                'mean': sum(values) / len(values)
+            }
+        return result
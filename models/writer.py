@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Befehls-Writer für Dynamic Messe Stand V4
+Asynchrones Senden über einen eigenen Thread je Gerät
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+import serial
+from core.logger import logger
+from models.recorder import OUTBOUND
+
+# Prioritäts-Spuren: Steuerbefehle überholen Massendaten (Flash, Animationen)
+CONTROL = 'control'
+BULK = 'bulk'
+LANES = (CONTROL, BULK)
+
+def payload_size(payload):
+    """Bytes eines Eintrags (einzelner Puffer oder Tupel von Puffern)"""
+    if isinstance(payload, tuple):
+        return sum(memoryview(part).nbytes for part in payload)
+    return len(payload)
+
+class TokenBucket:
+    """Begrenzt die Senderate auf ``rate`` Bytes/s mit Bursts bis ``burst`` Bytes"""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = self.burst
+        self.stamp = time.monotonic()
+
+    def delay(self, size, now=None):
+        """Sekunden, bis ``size`` Bytes gesendet werden dürfen (0 = sofort)"""
+        now = now or time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        # Größere Pakete als der Burst dürfen bei vollem Eimer raus (Schulden)
+        needed = min(size, self.burst)
+        return 0.0 if self.tokens >= needed else (needed - self.tokens) / self.rate
+
+    def consume(self, size):
+        self.tokens -= size
+
+class CommandWriter:
+    """Schreibt eingereihte Befehle eines Geräts in einem eigenen Thread
+
+    Alle beim Aufwachen wartenden Befehle werden zu einem einzigen write()
+    zusammengefasst, Befehle der Spur CONTROL vor denen der Spur BULK. Mit
+    ``rate`` (Bytes/s) drosselt ein Token-Bucket den Datenstrom, damit der
+    UART-Empfangspuffer des Boards nicht überläuft. Jeder Befehl liefert ein
+    Future, dessen Ergebnis der time.monotonic()-Zeitpunkt des
+    abgeschlossenen Schreibvorgangs ist. Schlägt ein Schreibvorgang fehl,
+    pausiert der Writer und behält die Befehle, bis ``resume()`` nach einem
+    Reconnect aufgerufen wird.
+
+    Ein Eintrag ist ein Puffer oder ein Tupel von Puffern; er wird immer am
+    Stück geschrieben, andere Befehle landen nie zwischen seinen Teilen.
+    """
+
+    def __init__(self, connection, max_batch_bytes=4096, max_pending=1024, rate=0, burst=256):
+        self.connection = connection
+        self.max_batch_bytes = max_batch_bytes
+        self.max_pending = max_pending
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.thread = None
+        self.running = False
+        self.paused = False
+        self._lanes = {lane: deque() for lane in LANES}
+        self._queued_bytes = {lane: 0 for lane in LANES}
+        self._cond = threading.Condition()
+        self._idle = threading.Event()  # kein Schreibvorgang unterwegs
+        self._idle.set()
+        self.writes = 0
+        self.commands = 0
+        self.bytes_written = 0
+        self.throttled_bytes = 0
+        self.throttle_time = 0.0
+        self.queued_bytes_peak = 0
+
+    def start(self):
+        """Startet den Writer-Thread (idempotent)"""
+        with self._cond:
+            if self.running:
+                return
+            self.running = True
+            self.thread = threading.Thread(
+                target=self._loop,
+                name=f"Writer-{self.connection.name}",
+                daemon=True
+            )
+            self.thread.start()
+
+    def stop(self, timeout=2):
+        """Stoppt den Writer; noch wartende Befehle schlagen fehl"""
+        with self._cond:
+            if not self.running:
+                return
+            self.running = False
+            self._cond.notify()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=timeout)
+
+    def submit(self, payload, priority=CONTROL):
+        """Reiht fertige Bytes in der Spur ``priority`` ein und liefert ein Future
+
+        Ein Tupel von Puffern (z.B. Kopf, Daten, Prüfsumme) wird ohne Kopie
+        übernommen und als ein unteilbarer Eintrag geschrieben.
+        """
+        if isinstance(payload, list):
+            payload = tuple(payload)
+        future = Future()
+        with self._cond:
+            if not self.running:
+                future.set_exception(serial.SerialException(f"Writer für {self.connection.name} gestoppt"))
+                return future
+            if self.pending() >= self.max_pending:
+                future.set_exception(serial.SerialException(f"Sende-Queue von {self.connection.name} voll"))
+                return future
+            self._lanes[priority].append((payload, future))
+            self._queued_bytes[priority] += payload_size(payload)
+            self.queued_bytes_peak = max(self.queued_bytes_peak, sum(self._queued_bytes.values()))
+            self._cond.notify()
+        return future
+
+    def pause(self, timeout=2):
+        """Hält das Schreiben an und wartet einen laufenden Schreibvorgang ab"""
+        with self._cond:
+            self.paused = True
+        if self.thread is not threading.current_thread():
+            self._idle.wait(timeout)
+
+    def resume(self):
+        """Setzt einen pausierten Writer fort (nach erfolgreichem Reconnect)"""
+        with self._cond:
+            self.paused = False
+            self._cond.notify()
+
+    def pending(self):
+        """Anzahl noch nicht geschriebener Befehle"""
+        return sum(len(queue) for queue in self._lanes.values())
+
+    def get_stats(self):
+        """Sende-Statistik inkl. Drosselung und wartender Bytes je Spur"""
+        with self._cond:
+            return {
+                'writes': self.writes,
+                'commands': self.commands,
+                'bytes_written': self.bytes_written,
+                'queued_bytes': dict(self._queued_bytes),
+                'queued_bytes_peak': self.queued_bytes_peak,
+                'throttled_bytes': self.throttled_bytes,
+                'throttle_time': round(self.throttle_time, 3),
+                'rate': self.bucket.rate if self.bucket else None
+            }
+
+    def _head(self):
+        """Nächster Befehl nach Priorität (oder None)"""
+        for lane in LANES:
+            if self._lanes[lane]:
+                return self._lanes[lane][0][0]
+        return None
+
+    def _next_batch(self):
+        """Wartet auf Befehle und entnimmt so viele, wie in einen Schreibvorgang passen"""
+        with self._cond:
+            throttled = False
+            while True:
+                while self.running and (self.paused or not self.pending()):
+                    self._cond.wait()
+                if not self.running or not self.bucket:
+                    break
+                delay = self.bucket.delay(payload_size(self._head()))
+                if not delay:
+                    break
+                # Warten auf Tokens; ein neuer Steuerbefehl weckt und wird neu eingeplant
+                throttled = True
+                started = time.monotonic()
+                self._cond.wait(delay)
+                self.throttle_time += time.monotonic() - started
+
+            if not self.pending():
+                return []
+            self._idle.clear()
+            limit = self.max_batch_bytes
+            if self.bucket:
+                limit = min(limit, max(int(self.bucket.tokens), payload_size(self._head())))
+            batch = []
+            size = 0
+            for lane in LANES:
+                queue = self._lanes[lane]
+                # Nur ganze Einträge: ein Eintrag wird nie auf zwei Schreibvorgänge verteilt
+                while queue and (not batch or size + payload_size(queue[0][0]) <= limit):
+                    payload, future = queue.popleft()
+                    batch.append((payload, future, lane))
+                    size += payload_size(payload)
+                    self._queued_bytes[lane] -= payload_size(payload)
+                if queue:
+                    break  # Reihenfolge wahren: keine niedrigere Spur an einer höheren vorbei
+            if self.bucket:
+                self.bucket.consume(size)
+                if throttled:
+                    self.throttled_bytes += size
+            return batch
+
+    def _loop(self):
+        """Haupt-Schleife des Writer-Threads"""
+        while self.running:
+            batch = self._next_batch()
+            if not batch:
+                continue
+
+            port = self.connection.connection
+            try:
+                if not port or not port.is_open:
+                    raise serial.SerialException(f"{self.connection.name} nicht verbunden")
+                parts = [part for payload, _, _ in batch
+                         for part in (payload if isinstance(payload, tuple) else (payload,))]
+                data = parts[0] if len(parts) == 1 else b''.join(parts)
+                port.write(data)
+                done = time.monotonic()
+                self.connection._record(OUTBOUND, data)
+                self.writes += 1
+                self.commands += len(batch)
+                self.bytes_written += len(data)
+                for _, future, _ in batch:
+                    future.set_result(done)
+            except Exception as e:
+                logger.error(f"Fehler beim Senden an {self.connection.name}: {e}")
+                # Befehle behalten und pausieren, bis die Verbindung wieder steht
+                with self._cond:
+                    for payload, future, lane in reversed(batch):
+                        self._lanes[lane].appendleft((payload, future))
+                        self._queued_bytes[lane] += payload_size(payload)
+                    self.paused = True
+                self.connection.status = "error"
+            finally:
+                self._idle.set()
+
+        # Beim Stoppen verbleibende Befehle abbrechen
+        with self._cond:
+            remaining = [item for lane in LANES for item in self._lanes[lane]]
+            for lane in LANES:
+                self._lanes[lane].clear()
+                self._queued_bytes[lane] = 0
+        for _, future in remaining:
+            future.set_exception(serial.SerialException(f"Writer für {self.connection.name} gestoppt"))
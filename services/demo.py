@@ -10,13 +10,43 @@ from core.logger import logger
 from core.config import config
 from models.content import content_manager
 from models.hardware import hardware_manager
+from services.udp import udp_transport, parse_target
+
+def send_udp_signal(signal_id, value=1):
+    """Sendet ein Signal an die UDP-Ziele, je nach ``udp_mode`` direkt oder über den GIGA
+    
+    Wartet nicht; liefert die Futures der einzelnen Sendungen (leer, wenn der
+    GIGA nicht verbunden ist).
+    """
+    if config.hardware['udp_mode'] == 'host':
+        return [udp_transport.send(signal_id, value)]
+    giga = hardware_manager.get_connection('giga')
+    if not giga or giga.status != "connected":
+        return []
+    targets = config.hardware['udp_targets']
+    if config.hardware['udp_multicast']:
+        targets = [config.hardware['udp_multicast']]
+    return [
+        giga.send_udp_signal(parse_target(target)[0], signal_id, value, block=False)
+        for target in targets
+    ]
 
 class DemoService:
-    """Service für automatische Demo-Präsentationen"""
+    """Service für automatische Demo-Präsentationen
+    
+    Die Slide-Wechsel laufen gegen absolute ``time.monotonic()``-Termine: der
+    nächste Termin ergibt sich aus dem geplanten, nicht dem tatsächlichen
+    Wechsel, Verspätungen summieren sich also nicht. Dazwischen schläft der
+    Thread in ``Event.wait``; Stop, Slide-Sprünge und eine neue Slide-Dauer
+    wecken ihn sofort.
+    """
     
     def __init__(self):
         self.running = False
         self.demo_thread = None
+        self.slide_started = None  # monotonic-Zeitpunkt, ab dem die aktuelle Slide zählt
+        self._wakeup = threading.Event()
+        self.realignments = 0  # Wechsel, die mehr als eine Slide-Dauer zu spät kamen
         self.current_slide = 1
         self.slide_duration = config.content['demo_slide_duration']
         self.total_slides = 10  # Standard
@@ -56,7 +86,8 @@ class DemoService:
             return False
         
         self.running = True
-        self.demo_thread = threading.Thread(target=self._demo_loop, daemon=True)
+        self._wakeup.clear()
+        self.demo_thread = threading.Thread(target=self._demo_loop, name="DemoLoop", daemon=True)
         self.demo_thread.start()
         
         logger.info(f"Demo gestartet - Slide {start_slide}, {self.slide_duration}s pro Slide")
@@ -68,7 +99,9 @@ class DemoService:
             return False
         
         self.running = False
-        if self.demo_thread and self.demo_thread.is_alive():
+        self._wakeup.set()
+        if (self.demo_thread and self.demo_thread.is_alive()
+                and self.demo_thread is not threading.current_thread()):
             self.demo_thread.join(timeout=2)
         
         logger.info("Demo gestoppt")
@@ -80,6 +113,13 @@ class DemoService:
     
     def next_slide(self):
         """Wechselt zur nächsten Slide"""
+        if not self._advance():
+            return False
+        self._restart_timer()
+        return True
+    
+    def _advance(self):
+        """Nächste Slide anzeigen, ohne den Demo-Takt neu zu starten"""
         if self.total_slides == 0:
             return False
         
@@ -106,6 +146,7 @@ class DemoService:
         
         self._send_slide_signal(self.current_slide)
         self._notify_callbacks(self.current_slide)
+        self._restart_timer()
         return True
     
     def goto_slide(self, slide_id):
@@ -116,48 +157,66 @@ class DemoService:
         self.current_slide = slide_id
         self._send_slide_signal(self.current_slide)
         self._notify_callbacks(self.current_slide)
+        self._restart_timer()
         return True
     
+    def _restart_timer(self):
+        """Manuell gewählte Slide bekommt wieder die volle Dauer"""
+        if self.running:
+            self.slide_started = time.monotonic()
+            self._wakeup.set()
+    
     def _demo_loop(self):
         """Haupt-Demo-Schleife"""
-        while self.running:
-            try:
-                # Aktuelle Slide anzeigen
-                self._send_slide_signal(self.current_slide)
-                self._notify_callbacks(self.current_slide)
-                
-                # Warten für Slide-Dauer
-                start_time = time.time()
-                while self.running and (time.time() - start_time) < self.slide_duration:
-                    time.sleep(0.1)
-                
-                if not self.running:
-                    break
+        try:
+            # Aktuelle Slide anzeigen
+            self.slide_started = time.monotonic()
+            self._send_slide_signal(self.current_slide)
+            self._notify_callbacks(self.current_slide)
+            
+            while self.running:
+                # Termin bei jedem Aufwachen neu berechnen (Sprung oder neue Dauer)
+                deadline = self.slide_started + self.slide_duration
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._wakeup.wait(remaining)
+                    self._wakeup.clear()
+                    continue
                 
                 # Zur nächsten Slide
-                if not self.next_slide():
+                if not self._advance():
                     break
-                    
-            except Exception as e:
-                logger.error(f"Fehler in Demo-Schleife: {e}")
-                break
+                
+                # Nächster Termin ab dem geplanten Wechsel; nach längerem Hänger neu ausrichten
+                now = time.monotonic()
+                if now - deadline < self.slide_duration:
+                    self.slide_started = deadline
+                else:
+                    self.slide_started = now
+                    self.realignments += 1
+                
+        except Exception as e:
+            logger.error(f"Fehler in Demo-Schleife: {e}")
         
         self.running = False
     
     def _send_slide_signal(self, slide_id):
         """Sendet Signal an Hardware für Slide-Wechsel"""
         try:
-            # Signal an alle ESP32s senden
-            for name, connection in hardware_manager.connections.items():
-                if name.startswith('esp32_'):
-                    connection.send_signal(f"page_{slide_id}")
+            signal_id = f"page_{slide_id}"
+            
+            # UDP-Signal direkt vom Host oder über den GIGA, läuft parallel zum Broadcast
+            send_udp_signal(signal_id)
             
-            # UDP-Signal über GIGA senden (falls verfügbar)
-            giga = hardware_manager.get_connection('giga')
-            if giga and giga.status == "connected":
-                giga.send_udp_signal("192.168.1.100", f"page_{slide_id}", 1)
+            # Signal gleichzeitig an alle ESP32s der Slide-Gruppe senden
+            report = hardware_manager.broadcast(
+                lambda connection: connection.send_signal(signal_id, block=False),
+                group=config.hardware['slide_group']
+            )
             
-            logger.debug(f"Slide-Signal gesendet: page_{slide_id}")
+            skew = f"{report['skew'] * 1000:.2f} ms" if report['skew'] is not None else "-"
+            logger.debug(f"Slide-Signal gesendet: {signal_id} (Versatz {skew}, "
+                         f"{len(report['suppressed'])} unverändert übersprungen)")
             
         except Exception as e:
             logger.error(f"Fehler beim Senden des Slide-Signals: {e}")
@@ -165,6 +224,7 @@ class DemoService:
     def set_slide_duration(self, duration):
         """Setzt die Slide-Dauer"""
         self.slide_duration = max(1, duration)  # Minimum 1 Sekunde
+        self._wakeup.set()  # laufende Slide mit neuer Dauer neu terminieren
         logger.info(f"Slide-Dauer geändert: {self.slide_duration}s")
     
     def set_loop_mode(self, loop_enabled):
@@ -179,7 +239,8 @@ class DemoService:
             'current_slide': self.current_slide,
             'total_slides': self.total_slides,
             'slide_duration': self.slide_duration,
-            'loop_mode': self.loop_demo
+            'loop_mode': self.loop_demo,
+            'realignments': self.realignments
         }
     
     def reset_to_first_slide(self):
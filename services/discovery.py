@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Port-Erkennung für Dynamic Messe Stand V4
+Findet ESP32/GIGA-Boards über VID/PID bzw. Seriennummer und erkennt Hot-Plug
+"""
+
+import json
+import os
+import threading
+from core.logger import logger
+from core.config import config
+
+try:
+    from serial.tools import list_ports
+except ImportError:  # pyserial ohne tools-Paket
+    list_ports = None
+
+def port_identity(port):
+    """Stabile Kennung eines Ports: Seriennummer, sonst USB-Position, sonst Gerätepfad"""
+    return port.serial_number or port.location or port.device
+
+class PortDiscovery:
+    """Ordnet angeschlossene Boards den Gerätenamen des HardwareManagers zu
+
+    Reihenfolge: feste Seriennummern aus ``device_serials`` bzw. der
+    Geräte-Registry, dann die zwischengespeicherte Zuordnung früherer Läufe,
+    zuletzt freie Registry-Namen nach VID/PID. So bleibt ein Board auch bei
+    geänderter USB-Reihenfolge bei seinem Namen. Der Watcher prüft nur den
+    Zeitstempel von ``/dev`` und scannt erst bei einer Änderung neu.
+    """
+
+    def __init__(self, lister=None, cache_path=None, dev_path='/dev', registry=None):
+        self.lister = lister or (list_ports.comports if list_ports else (lambda: []))
+        self.cache_path = cache_path or os.path.join(config.base_dir, "data", "ports.json")
+        self.dev_path = dev_path
+        self.mapping = {}
+        self.registry = registry
+        self.cache = self._load_cache()
+        self.manager = None
+        self.thread = None
+        self._stop = threading.Event()
+        self._dev_mtime = None
+        self._lock = threading.Lock()
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump(self.cache, f, indent=2)
+        except OSError as e:
+            logger.warning(f"Port-Cache konnte nicht gespeichert werden: {e}")
+
+    @staticmethod
+    def _kind(port):
+        """'esp32', 'giga' oder None anhand der VID/PID-Regeln"""
+        for kind, ids in config.hardware['discovery_rules'].items():
+            if (port.vid, port.pid) in ids:
+                return kind
+        return None
+
+    def scan(self):
+        """Ermittelt {Gerätename: Port-Pfad} für alle erkannten Boards"""
+        ports = sorted((p for p in self.lister() if p.vid is not None), key=lambda p: p.device)
+        mapping = {}
+        claimed = set()
+
+        def assign(name, port):
+            mapping[name] = port.device
+            claimed.add(port.device)
+            self.cache[port_identity(port)] = name
+
+        # 1. Feste Zuordnung über die Seriennummer
+        serials = dict(config.hardware['device_serials'])
+        if self.registry:
+            serials.update(self.registry.serials())
+        for port in ports:
+            for name, serial_number in serials.items():
+                if serial_number and port.serial_number == serial_number and name not in mapping:
+                    assign(name, port)
+
+        # 2. Bekannte Boards aus früheren Läufen
+        for port in ports:
+            name = self.cache.get(port_identity(port))
+            if port.device not in claimed and name and name not in mapping and self._kind(port):
+                assign(name, port)
+
+        # 3. Neue Boards auf freie Plätze nach VID/PID
+        for port in ports:
+            if port.device in claimed:
+                continue
+            kind = self._kind(port)
+            if kind:
+                assign(self._free_name(kind, mapping, serials), port)
+
+        self._save_cache()
+        return mapping
+
+    def _free_name(self, kind, mapping, serials):
+        """Nächster freier Gerätename eines Typs: zuerst aus der Registry, dann fortlaufend"""
+        candidates = self.registry.names_of_type(kind) if self.registry else []
+        for name in candidates:
+            if name not in mapping and name not in serials:
+                return name
+        if kind == 'giga' and 'giga' not in mapping:
+            return 'giga'
+        instance_number = 1
+        while f"{kind}_{instance_number}" in mapping or f"{kind}_{instance_number}" in serials:
+            instance_number += 1
+        return f"{kind}_{instance_number}"
+
+    def _kind_of(self, name):
+        if self.registry and name in self.registry.devices:
+            return self.registry.devices[name]['type']
+        return 'giga' if name.startswith('giga') else 'esp32'
+
+    def attach(self, manager, fallback=True):
+        """Legt für alle erkannten Boards Verbindungen im HardwareManager an
+
+        Mit ``fallback`` werden Registry-Geräte, die nicht gefunden wurden, wie
+        bisher mit ihrem konfigurierten Port angelegt (sofern dieser Port frei ist).
+        """
+        self.manager = manager
+        self.registry = manager.registry
+        with self._lock:
+            self.mapping = self.scan()
+            self._dev_mtime = self._stat_dev()
+        ports = dict(self.mapping)
+        if fallback:
+            used = set(ports.values())
+            for name, spec in self.registry.devices.items():
+                port = spec.get('port')
+                if name not in ports and port and port not in used:
+                    ports[name] = port
+        for name, port in sorted(ports.items()):
+            self._add(name, port)
+            logger.info(f"{name}: {port}{'' if name in self.mapping else ' (aus Konfiguration)'}")
+        return ports
+
+    def _add(self, name, port):
+        return self.manager.add_device(name, self._kind_of(name), port)
+
+    def start_watching(self, interval=None):
+        """Startet den Hot-Plug-Watcher"""
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop.clear()
+        self.thread = threading.Thread(
+            target=self._watch, args=(interval or config.hardware['discovery_interval'],),
+            name="PortDiscovery", daemon=True
+        )
+        self.thread.start()
+        logger.info(f"Port-Watcher aktiv ({self.dev_path})")
+
+    def stop_watching(self):
+        self._stop.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2)
+
+    def _stat_dev(self):
+        try:
+            return os.stat(self.dev_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _watch(self, interval):
+        while not self._stop.wait(interval):
+            mtime = self._stat_dev()
+            if mtime == self._dev_mtime:
+                continue
+            self._dev_mtime = mtime
+            try:
+                self.rescan()
+            except Exception as e:
+                logger.error(f"Fehler beim Port-Scan: {e}")
+
+    def rescan(self):
+        """Gleicht die Zuordnung ab; liefert (hinzugekommen, entfernt) als Namenslisten"""
+        with self._lock:
+            previous, self.mapping = self.mapping, self.scan()
+        added = [name for name, port in self.mapping.items() if previous.get(name) != port]
+        removed = [name for name in previous if name not in self.mapping]
+
+        for name in removed:
+            logger.warning(f"{name} abgesteckt ({previous[name]})")
+        for name in added:
+            port = self.mapping[name]
+            logger.info(f"{name} angesteckt ({port})")
+            if self.manager:
+                self._plug_in(name, port)
+        return added, removed
+
+    def _plug_in(self, name, port):
+        """Übernimmt ein (wieder) angestecktes Board in den HardwareManager"""
+        connection = self.manager.get_connection(name)
+        if connection is None:
+            connection = self._add(name, port)
+        elif connection.port != port:
+            connection.port = port  # neuer Pfad nach Umstecken
+        if connection.status == "connected" or connection.connecting:
+            return
+        supervisor = self.manager.supervisor
+        if supervisor and supervisor.running:
+            # Der Supervisor verbindet ohnehin neu - nur den Backoff aufheben
+            supervisor.retry_now(name)
+        else:
+            threading.Thread(
+                target=self.manager._connect_device, args=(name, connection),
+                name=f"Connect-{name}", daemon=True
+            ).start()
+
+# Globale Port-Erkennung
+port_discovery = PortDiscovery()
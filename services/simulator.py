@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Hardware-Simulator für Dynamic Messe Stand V4
+Virtuelle ESP32/GIGA-Boards auf Pseudo-Terminals für Tests ohne Hardware
+"""
+
+import os
+import base64
+import heapq
+import random
+import selectors
+import termios
+import threading
+import time
+import tty
+import zlib
+from core.logger import logger
+from core.config import config
+from models.codec import BinaryCodec, ProtocolError, PROTOCOL_QUERY, PROTOCOL_ACCEPT
+from models.streamer import FRAME_SYNC, FRAME_HEADER, FRAME_CRC
+
+# termios-Konstante -> Baudrate (z.B. termios.B921600 -> 921600)
+TERMIOS_RATES = {
+    getattr(termios, name): int(name[1:])
+    for name in dir(termios) if name.startswith('B') and name[1:].isdigit()
+}
+
+class VirtualDevice:
+    """Emuliert ein ESP32- oder GIGA-Board auf einem pty
+
+    Der Host öffnet ``port`` wie einen echten seriellen Port. Antworten werden
+    mit ``latency`` ± ``jitter`` Sekunden verzögert, Telemetrie wird mit
+    ``telemetry_rate`` Zeilen pro Sekunde erzeugt. Der Bootloader braucht
+    ``flash_delay`` Sekunden je Block; ``flash_corrupt_rate`` simuliert
+    Übertragungsfehler (Anteil der Blöcke mit falscher CRC). ``link_delay``
+    ist die Laufzeit Host -> Board; die Board-Uhr hat einen zufälligen Offset
+    und läuft um ``clock_drift_ppm`` falsch. Das Board beherrscht die
+    ``baud_rates``; oberhalb von ``baud_limit`` kommen nur verstümmelte Bytes
+    an. Stimmt die Rate des Hosts (aus den termios-Einstellungen des pty) nicht
+    mit der des Boards überein, gehen Daten in beide Richtungen verloren. Nach
+    BAUD_SET kehrt das Board zur alten Rate zurück, wenn binnen
+    ``baud_confirm_timeout`` kein gültiger BAUD_TEST ankommt.
+    """
+
+    def __init__(self, kind='esp32', name=None, latency=0.0, jitter=0.0,
+                 telemetry_rate=0.0, binary=True, flash_delay=0.0, flash_corrupt_rate=0.0,
+                 link_delay=0.0, clock_drift_ppm=0.0, baud_rate=115200,
+                 baud_rates=(921600, 460800, 230400, 115200), baud_limit=None,
+                 baud_confirm_timeout=None):
+        self.kind = kind
+        self.name = name or kind
+        self.latency = latency
+        self.jitter = jitter
+        self.telemetry_rate = telemetry_rate
+        self.binary = binary
+        self.codec = BinaryCodec()
+        self.flash_delay = flash_delay
+        self.flash_corrupt_rate = flash_corrupt_rate
+        self.flash = None
+        self._flash_busy_until = 0.0
+        self.link_delay = link_delay
+        self.clock_drift = clock_drift_ppm / 1e6
+        self._clock_epoch = time.monotonic()
+        self._clock_offset_us = random.randint(0, 10**9)
+        self.executed = []
+        self.frames_received = 0
+        self.frames_corrupt = 0
+        self.last_frame = None
+        self.base_baud = baud_rate
+        self.baud = baud_rate
+        self.baud_rates = tuple(baud_rates)
+        self.baud_limit = baud_limit
+        self.baud_confirm_timeout = baud_confirm_timeout or config.hardware['baud_confirm_timeout']
+        self._baud_revert = None  # (alte Rate, Frist) bis zum bestätigenden BAUD_TEST
+        self.baud_reverts = 0
+        self.baud_errors = 0
+
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        os.set_blocking(self.master_fd, False)
+        self.port = os.ttyname(self.slave_fd)
+
+        self.thread = None
+        self.running = False
+        self.state = {}
+        self.responsive = True
+        self.commands_received = 0
+        self.telemetry_sent = 0
+        self.tx_dropped = 0
+        self._inbox = bytearray()
+        self._outbox = []
+        self._outbox_lock = threading.Lock()
+        self._sequence = 0
+        self._rng = random.Random()
+
+    def start(self):
+        """Startet den Simulations-Thread"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name=f"Sim-{self.name}", daemon=True)
+        self.thread.start()
+        logger.debug(f"Virtuelles Board {self.name} auf {self.port}")
+
+    def stop(self):
+        """Stoppt die Simulation und schließt das pty"""
+        self.running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2)
+        for fd in (self.master_fd, self.slave_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def send_line(self, text, delay=None):
+        """Plant eine Zeile vom Board an den Host"""
+        self._schedule(f"{text}\n".encode('utf-8'), delay)
+
+    def _schedule(self, payload, delay=None):
+        if delay is None:
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+        with self._outbox_lock:
+            self._sequence += 1
+            heapq.heappush(self._outbox, (time.monotonic() + delay, self._sequence, payload))
+
+    def _loop(self):
+        """Simulations-Schleife: Befehle lesen, Antworten und Telemetrie ausgeben"""
+        selector = selectors.DefaultSelector()
+        selector.register(self.master_fd, selectors.EVENT_READ)
+        interval = 1.0 / self.telemetry_rate if self.telemetry_rate else None
+        next_telemetry = time.monotonic() + interval if interval else None
+
+        try:
+            while self.running:
+                now = time.monotonic()
+                wake = [now + 0.25]
+                if self._outbox:
+                    wake.append(self._outbox[0][0])
+                if next_telemetry:
+                    wake.append(next_telemetry)
+                if self._baud_revert:
+                    wake.append(self._baud_revert[1])
+                for _key, _mask in selector.select(max(0.0, min(wake) - now)):
+                    self._read_commands()
+
+                now = time.monotonic()
+                if self._baud_revert and self._baud_revert[1] <= now:
+                    # Kein gültiger BAUD_TEST: zurück zur alten Rate
+                    self.baud = self._baud_revert[0]
+                    self._baud_revert = None
+                    self.baud_reverts += 1
+                chunks = []
+                with self._outbox_lock:
+                    while self._outbox and self._outbox[0][0] <= now:
+                        chunks.append(heapq.heappop(self._outbox)[2])
+                while next_telemetry and next_telemetry <= now:
+                    chunks.append(self._telemetry_line())
+                    next_telemetry += interval
+                if chunks:
+                    self._write(b''.join(chunks))
+        except OSError as e:
+            if self.running:
+                logger.error(f"Simulator {self.name} beendet: {e}")
+        finally:
+            selector.close()
+
+    def _host_baud(self):
+        """Baudrate, die der Host gerade eingestellt hat (None bei Sonderraten)"""
+        try:
+            return TERMIOS_RATES.get(termios.tcgetattr(self.slave_fd)[5])
+        except termios.error:
+            return self.baud
+
+    def _link_ok(self):
+        host_baud = self._host_baud()
+        if host_baud != self.baud and host_baud == self.base_baud and not self._baud_revert:
+            # Host hat den Port neu geöffnet: DTR-Reset, das Board startet mit der Grundrate
+            self.baud = self.base_baud
+        if host_baud != self.baud or (self.baud_limit and self.baud > self.baud_limit):
+            self.baud_errors += 1
+            return False
+        return True
+
+    def _write(self, data):
+        if not self._link_ok():
+            return  # falsche Rate: beim Host kommt nur Rauschen an
+        try:
+            os.write(self.master_fd, data)
+        except BlockingIOError:
+            self.tx_dropped += 1  # Host liest nicht schnell genug, wie ein voller UART
+
+    def _telemetry_line(self):
+        self.telemetry_sent += 1
+        value = 20.0 + 5.0 * self._rng.random()
+        return f"SENSOR:temp:{value:.2f}\n".encode('ascii')
+
+    def _read_commands(self):
+        """Liest verfügbare Bytes und zerlegt sie in Text-Zeilen und Binär-Frames"""
+        try:
+            self._inbox += os.read(self.master_fd, 65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            return  # Host hat den Port (noch) nicht geöffnet
+        if not self._link_ok():
+            self._inbox.clear()
+            return
+
+        inbox = self._inbox
+        while inbox:
+            if inbox[0] == FRAME_SYNC:
+                # LED-Frame: Kopf, Pixeldaten, CRC32 - keine Antwort
+                if len(inbox) < FRAME_HEADER.size:
+                    break
+                _sync, seq, length = FRAME_HEADER.unpack_from(inbox)
+                size = FRAME_HEADER.size + length + FRAME_CRC.size
+                if len(inbox) < size:
+                    break
+                pixels = bytes(inbox[FRAME_HEADER.size:FRAME_HEADER.size + length])
+                (crc,) = FRAME_CRC.unpack_from(inbox, size - FRAME_CRC.size)
+                del inbox[:size]
+                if zlib.crc32(pixels) != crc:
+                    self.frames_corrupt += 1
+                    continue
+                self.frames_received += 1
+                self.last_frame = (seq, pixels)
+            elif inbox[0] == BinaryCodec.SYNC:
+                if len(inbox) < 2 or len(inbox) < inbox[1] + 4:
+                    break
+                size = inbox[1] + 4
+                frame = bytes(inbox[:size])
+                del inbox[:size]
+                try:
+                    command, args, seq = self.codec.decode(frame)
+                except ProtocolError as e:
+                    self.send_line(f"ERR:{e}")
+                    continue
+                self._handle(command, [str(arg) for arg in args], seq=seq)
+            else:
+                end = inbox.find(b'\n')
+                if end < 0:
+                    break
+                line = inbox[:end].decode('utf-8', errors='replace').strip()
+                del inbox[:end + 1]
+                if line:
+                    body, _, seq = line.partition('#')
+                    command, *args = body.split(':')
+                    self._handle(command, args, line, int(seq) if seq.isdigit() else None)
+
+    def _handle(self, command, args, line=None, seq=None):
+        """Emuliert die Befehlssätze von ESP32 (SIGNAL), GIGA (UDP_*) sowie PING"""
+        self.commands_received += 1
+        if not self.responsive:
+            return  # simuliert ein hängendes Board
+        self._dispatch(command, args, line)
+        if seq is not None:
+            self.send_line(f"ACK:{seq}")
+
+    def _dispatch(self, command, args, line):
+        if line == PROTOCOL_QUERY:
+            if self.binary:
+                self.send_line(PROTOCOL_ACCEPT)
+        elif command == 'BAUD?':
+            self.send_line("BAUD:" + ",".join(str(rate) for rate in self.baud_rates))
+        elif command == 'BAUD_SET' and args:
+            rate = int(args[0])
+            if rate in self.baud_rates:
+                self._write(f"BAUD_OK:{rate}\n".encode('ascii'))  # noch mit alter Rate
+                previous = self._baud_revert[0] if self._baud_revert else self.baud
+                self._baud_revert = (previous, time.monotonic() + self.baud_confirm_timeout)
+                self.baud = rate
+            else:
+                self.send_line(f"BAUD_ERR:{rate}")
+        elif command == 'BAUD_TEST' and line:
+            self._baud_revert = None  # Testmuster kam mit der neuen Rate an: übernehmen
+            self.send_line(line)
+        elif command == 'PING' and args:
+            self.send_line(f"PONG:{args[0]}")
+        elif command == 'TSYNC' and len(args) >= 2:
+            # Empfang nach link_delay, Antwort sofort; die Rückrichtung kostet latency
+            received = self.board_time(time.monotonic() + self.link_delay)
+            self.send_line(f"TSYNC:{args[0]}:{args[1]}:{received}:{received}",
+                           delay=self.link_delay + max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter)))
+        elif command == 'SIGNAL_AT' and self.kind == 'esp32' and len(args) >= 3:
+            # Ausführung zur Board-Zeit; festgehalten wird der Host-Zeitpunkt der Ausführung
+            execute_at = self.host_time(int(args[0]))
+            self.executed.append((args[1], execute_at))
+            self.state[args[1].rsplit('_', 1)[0]] = args[1]
+            self.send_line(f"OK:SIGNAL:{args[1]}", delay=max(0.0, execute_at - time.monotonic()))
+        elif command == 'SIGNAL' and self.kind == 'esp32' and len(args) >= 2:
+            self.state[args[0].rsplit('_', 1)[0]] = args[0]
+            self.send_line(f"OK:SIGNAL:{args[0]}")
+        elif command in ('UDP_ENABLE', 'UDP_DISABLE') and self.kind == 'giga':
+            self.state['udp'] = command == 'UDP_ENABLE'
+            self.send_line(f"OK:{command}")
+        elif command == 'UDP_SEND' and self.kind == 'giga' and len(args) >= 3:
+            self.state['udp_last'] = (args[0], args[1])
+            self.send_line(f"OK:UDP_SEND:{args[0]}:{args[1]}")
+        elif command.startswith('FLASH_') and self.kind == 'esp32':
+            self._bootloader(command, args)
+        else:
+            self.send_line(f"ERR:UNKNOWN:{command}")
+
+    def board_time(self, host_time):
+        """Board-Uhr (µs) zum Host-Zeitpunkt ``host_time`` (time.monotonic)"""
+        return int((host_time - self._clock_epoch) * (1 + self.clock_drift) * 1e6) + self._clock_offset_us
+
+    def host_time(self, board_us):
+        """Host-Zeitpunkt (time.monotonic), zu dem die Board-Uhr ``board_us`` zeigt"""
+        return (board_us - self._clock_offset_us) / 1e6 / (1 + self.clock_drift) + self._clock_epoch
+
+    def _bootloader(self, command, args):
+        """Emuliert den Bootloader (Protokoll siehe models/flasher.py)"""
+        flash = self.flash
+        if command == 'FLASH_BEGIN':
+            size, crc = int(args[0]), int(args[1], 16)
+            if not flash or flash['crc'] != crc or flash['size'] != size:
+                flash = self.flash = {'size': size, 'crc': crc, 'data': bytearray(), 'nak': False}
+            flash['nak'] = False
+            self.send_line(f"FLASH_READY:{len(flash['data'])}")
+        elif flash is None:
+            self.send_line("FLASH_ERR:0:NOSESSION")
+        elif command == 'FLASH_DATA':
+            offset, crc = int(args[0]), int(args[1], 16)
+            expected = len(flash['data'])
+            if offset != expected:
+                # Nach einem Fehler nur einmal melden, Folgeblöcke still verwerfen
+                if not flash['nak']:
+                    flash['nak'] = True
+                    self.send_line(f"FLASH_ERR:{expected}:SEQ")
+                return
+            chunk = base64.b64decode(args[2])
+            if zlib.crc32(chunk) != crc or self._rng.random() < self.flash_corrupt_rate:
+                flash['nak'] = True
+                self.send_line(f"FLASH_ERR:{expected}:CRC")
+                return
+            flash['data'] += chunk
+            flash['nak'] = False
+            # Blöcke werden nacheinander geschrieben, wie beim echten Flash-Speicher
+            now = time.monotonic()
+            self._flash_busy_until = max(now, self._flash_busy_until) + self.flash_delay
+            self.send_line(f"FLASH_OK:{len(flash['data'])}", delay=self._flash_busy_until - now)
+        elif command == 'FLASH_END':
+            self.flash = None
+            if len(flash['data']) == flash['size'] and zlib.crc32(flash['data']) == flash['crc']:
+                self.state['firmware'] = f"{flash['crc']:08x}"
+                self.send_line(f"FLASH_DONE:{flash['crc']:08x}",
+                               delay=max(0.0, self._flash_busy_until - time.monotonic()))
+            else:
+                self.send_line("FLASH_ERR:0:IMAGE")
+
+class HardwareSimulator:
+    """Sammlung virtueller Boards, die sich wie echte Ports in den HardwareManager einhängen"""
+
+    def __init__(self):
+        self.devices = {}
+
+    def add_esp32(self, instance_number=1, name=None, **options):
+        """Erzeugt ein virtuelles ESP32 (Schlüssel wie im HardwareManager: esp32_N)"""
+        device = VirtualDevice('esp32', name or f"esp32_{instance_number}", **options)
+        self.devices[device.name] = device
+        return device
+
+    def add_giga(self, name='giga', **options):
+        """Erzeugt einen virtuellen Arduino GIGA"""
+        device = VirtualDevice('giga', name, **options)
+        self.devices[device.name] = device
+        return device
+
+    def start(self):
+        for device in self.devices.values():
+            device.start()
+
+    def stop(self):
+        for device in self.devices.values():
+            device.stop()
+
+    def attach(self, manager):
+        """Registriert alle virtuellen Boards über ihre pty-Pfade beim HardwareManager"""
+        for name, device in self.devices.items():
+            manager.add_device(name, device.kind, device.port)
+        return manager
+
+    def get_stats(self):
+        return {
+            name: {
+                'port': device.port,
+                'commands_received': device.commands_received,
+                'telemetry_sent': device.telemetry_sent,
+                'tx_dropped': device.tx_dropped,
+                'baud_rate': device.baud,
+                'baud_errors': device.baud_errors,
+                'baud_reverts': device.baud_reverts
+            }
+            for name, device in self.devices.items()
+        }
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+UDP-Transport für Dynamic Messe Stand V4
+Slide-Signale direkt vom Host per UDP statt über den GIGA-UART
+"""
+
+import selectors
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from core.logger import logger
+from core.config import config
+from models.ring_buffer import RingBuffer
+
+def parse_target(target, default_port=None):
+    """'host:port' oder 'host' -> (host, port)"""
+    host, _, port = target.rpartition(':')
+    if not host:
+        return target, default_port or config.hardware['udp_port']
+    return host, int(port)
+
+def _join_multicast(sock, group):
+    """Tritt einer Multicast-Gruppe auf allen Interfaces bei"""
+    membership = struct.pack('4s4s', socket.inet_aton(group), socket.inet_aton('0.0.0.0'))
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+
+class UDPTransport:
+    """Sendet Signale gebündelt an eine Liste von UDP-Zielen
+
+    Alle Nachrichten, die innerhalb eines ``tick`` für dasselbe Ziel anfallen,
+    gehen als ein Datagramm (zeilenweise "SIGNAL:<id>:<wert>") hinaus.
+    Antworten der Empfänger kommen auf demselben Socket zurück und werden an
+    ``on_reply(line, addr)`` gereicht.
+    """
+
+    def __init__(self, targets=None, multicast=None, tick=None, bind_port=None, on_reply=None):
+        multicast = multicast if multicast is not None else config.hardware['udp_multicast']
+        if multicast:
+            self.targets = [parse_target(multicast)]
+        else:
+            self.targets = [parse_target(t) for t in (targets or config.hardware['udp_targets'])]
+        self.multicast = bool(multicast)
+        self.tick = tick if tick is not None else config.hardware['udp_tick']
+        self.bind_port = bind_port if bind_port is not None else config.hardware['udp_reply_port']
+        self.on_reply = on_reply
+
+        self.sock = None
+        self.thread = None
+        self.running = False
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._futures = []  # (Future, Ziele) der noch nicht gesendeten Signale
+        self._wake_r = self._wake_w = None
+        self.replies = RingBuffer(256)
+        self.stats = {'messages': 0, 'packets': 0, 'bytes': 0, 'replies': 0, 'errors': 0}
+
+    def start(self):
+        """Öffnet den Socket und startet den Sende-/Empfangs-Thread (idempotent)"""
+        with self._lock:
+            if self.running:
+                return
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.bind(('0.0.0.0', self.bind_port))
+            self.sock.setblocking(False)
+            if self.multicast:
+                self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+                self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+            self._wake_r, self._wake_w = socket.socketpair()
+            self._wake_r.setblocking(False)
+            self._wake_w.setblocking(False)
+            self.running = True
+            self.thread = threading.Thread(target=self._loop, name="UDPTransport", daemon=True)
+            self.thread.start()
+        targets = ", ".join(f"{host}:{port}" for host, port in self.targets)
+        logger.info(f"UDP-Transport gestartet ({'Multicast' if self.multicast else 'Unicast'} -> {targets})")
+
+    def stop(self):
+        """Sendet ausstehende Nachrichten und schließt den Socket"""
+        with self._lock:
+            if not self.running:
+                return
+            self.running = False
+        self._wake()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2)
+        for sock in (self.sock, self._wake_r, self._wake_w):
+            sock.close()
+        logger.info("UDP-Transport gestoppt")
+
+    def send(self, signal_id, value=1, targets=None):
+        """Reiht ein Signal für alle (oder die angegebenen) Ziele ein
+        
+        Das gelieferte Future erhält beim Versand den time.monotonic()-Zeitpunkt
+        bzw. eine Exception, wenn ein Ziel nicht erreichbar war.
+        """
+        if not self.running:
+            self.start()
+        line = f"SIGNAL:{signal_id}:{value}".encode('utf-8')
+        destinations = self.targets if targets is None else [parse_target(t) for t in targets]
+        future = Future()
+        with self._lock:
+            idle = not self._pending
+            for destination in destinations:
+                self._pending.setdefault(destination, []).append(line)
+            self._futures.append((future, destinations))
+        if idle:
+            # Thread auf das kurze Tick-Timeout umschalten
+            self._wake()
+        return future
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass
+
+    def _flush(self):
+        """Ein Datagramm je Ziel mit allen gesammelten Zeilen"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            futures, self._futures = self._futures, []
+        failed = {}
+        for destination, lines in pending.items():
+            packet = b'\n'.join(lines)
+            try:
+                self.sock.sendto(packet, destination)
+                self.stats['packets'] += 1
+                self.stats['messages'] += len(lines)
+                self.stats['bytes'] += len(packet)
+            except OSError as e:
+                self.stats['errors'] += 1
+                failed[destination] = e
+                logger.error(f"UDP-Senden an {destination[0]}:{destination[1]} fehlgeschlagen: {e}")
+        done = time.monotonic()
+        for future, destinations in futures:
+            errors = [failed[d] for d in destinations if d in failed]
+            if errors:
+                future.set_exception(errors[0])
+            else:
+                future.set_result(done)
+
+    def _receive(self):
+        """Liest alle anstehenden Antworten"""
+        while True:
+            try:
+                packet, addr = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return  # z.B. ICMP "Port unreachable" eines Ziels
+            for line in packet.split(b'\n'):
+                if not line:
+                    continue
+                self.stats['replies'] += 1
+                self.replies.put((time.time(), addr, line))
+                if self.on_reply:
+                    try:
+                        self.on_reply(line, addr)
+                    except Exception as e:
+                        logger.error(f"Fehler in UDP-Antwort-Callback: {e}")
+
+    def _loop(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self.sock, selectors.EVENT_READ)
+        selector.register(self._wake_r, selectors.EVENT_READ)
+        flush_at = None
+        while self.running:
+            now = time.monotonic()
+            if flush_at is None and self._pending:
+                flush_at = now + self.tick
+            timeout = config.hardware['select_timeout'] if flush_at is None else max(0.0, flush_at - now)
+            for key, _mask in selector.select(timeout):
+                if key.fileobj is self._wake_r:
+                    try:
+                        while self._wake_r.recv(512):
+                            pass
+                    except BlockingIOError:
+                        pass
+                else:
+                    self._receive()
+            if flush_at is not None and time.monotonic() >= flush_at:
+                self._flush()
+                flush_at = None
+        self._flush()
+        selector.close()
+
+    def get_stats(self):
+        return dict(self.stats, targets=[f"{host}:{port}" for host, port in self.targets])
+
+class UDPReceiver:
+    """Empfängt Slide-Signale (Gegenstück zu UDPTransport, z.B. für Loopback-Tests)
+
+    Jede empfangene Zeile landet in ``received`` und bei ``handler(line, addr)``;
+    mit ``auto_reply`` wird ein SIGNAL mit "OK:SIGNAL:<id>" quittiert.
+    """
+
+    def __init__(self, port=None, host='0.0.0.0', multicast_group=None, handler=None, auto_reply=True):
+        self.port = port if port is not None else config.hardware['udp_port']
+        self.host = host
+        self.multicast_group = multicast_group
+        self.handler = handler
+        self.auto_reply = auto_reply
+        self.sock = None
+        self.thread = None
+        self.running = False
+        self.received = RingBuffer(1024)
+        self.packets = 0
+
+    def start(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        self.port = self.sock.getsockname()[1]
+        if self.multicast_group:
+            _join_multicast(self.sock, self.multicast_group)
+        self.sock.settimeout(config.hardware['select_timeout'])
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="UDPReceiver", daemon=True)
+        self.thread.start()
+        logger.info(f"UDP-Empfänger lauscht auf Port {self.port}")
+        return self.port
+
+    def stop(self):
+        self.running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2)
+        if self.sock:
+            self.sock.close()
+
+    def _loop(self):
+        while self.running:
+            try:
+                packet, addr = self.sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.packets += 1
+            replies = []
+            for line in packet.split(b'\n'):
+                if not line:
+                    continue
+                self.received.put((time.time(), addr, line))
+                if self.handler:
+                    try:
+                        self.handler(line, addr)
+                    except Exception as e:
+                        logger.error(f"Fehler in UDP-Handler: {e}")
+                if self.auto_reply and line.startswith(b'SIGNAL:'):
+                    replies.append(b'OK:SIGNAL:' + line.split(b':')[1])
+            if replies:
+                # Antworten ebenfalls gebündelt: ein Datagramm je Paket
+                self.sock.sendto(b'\n'.join(replies), addr)
+
+# Globale UDP-Transport Instanz (startet beim ersten send)
+udp_transport = UDPTransport()
@@ -9,6 +9,7 @@ from tkinter import ttk
 from core.theme import theme_manager
 from core.logger import logger
 from models.hardware import hardware_manager
+from models.events import TkExecutor
 from services.demo import demo_service
 
 class StatusPanelComponent(ttk.Frame):
@@ -20,6 +21,12 @@ class StatusPanelComponent(ttk.Frame):
         
         self.setup_status_panel()
         self.start_status_updates()
+        
+        # Verbindungswechsel sofort anzeigen, Callbacks laufen im Tk-Mainloop
+        self.tk_executor = TkExecutor(self)
+        for message_type in ('CONNECT', 'DISCONNECT'):
+            hardware_manager.subscribe(self.on_link_event, message_type=message_type,
+                                       executor=self.tk_executor)
     
     def setup_status_panel(self):
         """Erstellt das Status-Panel mit erweitertem Theme-System"""
@@ -45,6 +52,9 @@ class StatusPanelComponent(ttk.Frame):
         # Hardware-Status Sektion
         self.create_hardware_section()
         
+        # Sensor-Telemetrie Sektion
+        self.create_sensor_section()
+        
         # Demo-Status Sektion
         self.create_demo_section()
         
@@ -74,11 +84,10 @@ class StatusPanelComponent(ttk.Frame):
         # Status-Labels für Hardware-Geräte
         self.hw_status_labels = {}
         
+        registry = hardware_manager.registry
         hardware_devices = [
-            ('esp32_1', 'ESP32-1'),
-            ('esp32_2', 'ESP32-2'),
-            ('esp32_3', 'ESP32-3'),
-            ('giga', 'Arduino GIGA')
+            (name, registry.label(name))
+            for name in (hardware_manager.get_group('all') or list(registry.devices))
         ]
         
         for device_id, device_name in hardware_devices:
@@ -107,6 +116,44 @@ class StatusPanelComponent(ttk.Frame):
             
             self.hw_status_labels[device_id] = status_label
     
+    def create_sensor_section(self):
+        """Erstellt die Sensor-Sektion mit Werten und Verlaufskurve"""
+        colors = theme_manager.get_colors()
+        fonts = self.main_window.fonts
+        spacing = theme_manager.get_spacing()
+        
+        sensor_header = tk.Label(
+            self,
+            text="📈 Sensoren",
+            font=fonts['label'],
+            fg=colors['text_primary'],
+            bg=colors['background_tertiary']
+        )
+        sensor_header.pack(fill='x', padx=spacing['md'], pady=(spacing['sm'], spacing['xxs']))
+        
+        self.sensor_frame = tk.Frame(self, bg=colors['background_tertiary'])
+        self.sensor_frame.pack(fill='x', padx=spacing['md'], pady=(0, spacing['sm']))
+        
+        self.sensor_label = tk.Label(
+            self.sensor_frame,
+            text="Keine Daten",
+            font=fonts['caption'],
+            fg=colors['text_tertiary'],
+            bg=colors['background_tertiary'],
+            justify='left',
+            anchor='w'
+        )
+        self.sensor_label.pack(fill='x')
+        
+        # Verlaufskurve der ersten Sensor-Reihe
+        self.sensor_canvas = tk.Canvas(
+            self.sensor_frame,
+            height=int(40 * self.main_window.scale_factor),
+            bg=colors['background_tertiary'],
+            highlightthickness=0
+        )
+        self.sensor_canvas.pack(fill='x', pady=(spacing['xxs'], 0))
+    
     def create_demo_section(self):
         """Erstellt die Demo-Status Sektion mit Theme-System"""
         colors = theme_manager.get_colors()
@@ -218,21 +265,30 @@ class StatusPanelComponent(ttk.Frame):
     def update_status(self):
         """Aktualisiert alle Status-Informationen"""
         self.update_hardware_status()
+        self.update_sensor_status()
         self.update_demo_status()
         self.update_system_info()
     
     def update_hardware_status(self):
         """Aktualisiert Hardware-Status"""
         try:
-            status_summary = hardware_manager.get_status_summary()
+            # Nur zwischengespeicherter Zustand - Heartbeats laufen im I/O-Thread
+            status_summary = hardware_manager.get_status_summary(detailed=True)
             
             for device_id, status_label in self.hw_status_labels.items():
-                status = status_summary.get(device_id, "disconnected")
+                record = status_summary.get(device_id, {})
+                status = record.get('status', "disconnected")
                 
-                if status == "connected":
+                if status == "connected" and not record.get('alive', True):
+                    status_text = "🟡 Keine Antwort"
+                elif status == "connected" and record.get('rtt_ms') is not None:
+                    status_text = f"🟢 Online ({record['rtt_ms']:.0f} ms)"
+                elif status == "connected":
                     status_text = "🟢 Online"
                 elif status == "error":
                     status_text = "🟡 Fehler"
+                elif status == "reconnecting":
+                    status_text = "🟠 Verbinde..."
                 else:
                     status_text = "🔴 Offline"
                 
@@ -241,6 +297,50 @@ class StatusPanelComponent(ttk.Frame):
         except Exception as e:
             logger.error(f"Fehler beim Hardware-Status Update: {e}")
     
+    def on_link_event(self, device, message_type, status):
+        """Reagiert auf Verbindungsaufbau/-abbau eines Geräts"""
+        self.update_hardware_status()
+    
+    def update_sensor_status(self):
+        """Aktualisiert Sensorwerte und Verlaufskurve aus dem Spaltenpuffer"""
+        try:
+            summary = hardware_manager.get_sensor_summary(last=60)
+            if not summary:
+                return
+            
+            lines = [
+                f"{key}: {stats['last']:.1f} (Ø {stats['mean']:.1f})"
+                for key, stats in list(summary.items())[:4]
+            ]
+            self.sensor_label.configure(text="\n".join(lines))
+            
+            source, sensor = hardware_manager.telemetry.keys()[0]
+            _, values = hardware_manager.telemetry.series(source, sensor, last=60)
+            self.draw_sparkline(values)
+            
+        except Exception as e:
+            logger.error(f"Fehler beim Sensor-Status Update: {e}")
+    
+    def draw_sparkline(self, values):
+        """Zeichnet eine einfache Verlaufskurve"""
+        canvas = self.sensor_canvas
+        canvas.delete('all')
+        if len(values) < 2:
+            return
+        
+        width = canvas.winfo_width() or 1
+        height = canvas.winfo_height() or 1
+        low, high = min(values), max(values)
+        span = (high - low) or 1.0
+        step = width / (len(values) - 1)
+        points = []
+        for index, value in enumerate(values):
+            points.append(index * step)
+            points.append(height - 2 - (value - low) / span * (height - 4))
+        
+        colors = theme_manager.get_colors()
+        canvas.create_line(*points, fill=colors['accent_primary'], width=2)
+    
     def update_demo_status(self):
         """Aktualisiert Demo-Status"""
         try:
@@ -4,12 +4,15 @@ Presentation Tab für Dynamic Messe Stand V4
 Manuelle Präsentations-Steuerung
 """
 
+import time
 import tkinter as tk
 from tkinter import ttk
 from core.theme import theme_manager
 from core.logger import logger
 from models.content import content_manager
 from models.hardware import hardware_manager
+from core.config import config
+from services.demo import send_udp_signal
 
 class PresentationTab:
     """Presentation-Tab für manuelle Steuerung"""
@@ -240,7 +243,7 @@ class PresentationTab:
             fg='white',
             padx=15,
             pady=8,
-            command=self.send_hardware_signal
+            command=lambda: self.send_hardware_signal(force=True)
         )
         signal_btn.pack(fill='x', pady=(0, 10))
         
@@ -281,27 +284,29 @@ class PresentationTab:
             next_index = (current_index + 1) % len(slides)
             self.goto_slide(slides[next_index])
     
-    def send_hardware_signal(self):
-        """Sendet Signal an Hardware"""
+    def send_hardware_signal(self, force=False):
+        """Sendet Signal an Hardware
+        
+        ``force`` (Button "Signal senden") sendet auch an Boards, die laut
+        Zustands-Schatten die Slide schon zeigen; Navigation nutzt die Unterdrückung.
+        """
         try:
             signal_id = f"page_{self.current_slide}"
             
-            # Signal an alle ESP32s senden
-            sent_count = 0
-            for name, connection in hardware_manager.connections.items():
-                if name.startswith('esp32_') and connection.status == "connected":
-                    if connection.send_signal(signal_id):
-                        sent_count += 1
+            # Signal an die Slide-Gruppe senden - nur einreihen, der Tk-Thread wartet nie auf I/O
+            futures = []
+            for name in hardware_manager.get_group(config.hardware['slide_group']):
+                connection = hardware_manager.get_connection(name)
+                if connection and connection.status == "connected":
+                    futures.append(connection.send_signal(signal_id, block=False, force=force))
             
-            # UDP-Signal über GIGA senden
-            giga = hardware_manager.get_connection('giga')
-            if giga and giga.status == "connected":
-                giga.send_udp_signal("192.168.1.100", signal_id, 1)
-                sent_count += 1
+            # UDP-Signal wie im Demo-Betrieb (Host-Transport oder GIGA)
+            futures.extend(send_udp_signal(signal_id))
             
-            if sent_count > 0:
-                self.hw_status_label.configure(text=f"Signal gesendet: {signal_id}")
-                logger.info(f"Hardware-Signal gesendet: {signal_id}")
+            if futures:
+                self.hw_status_label.configure(text=f"Sende {signal_id}...")
+                deadline = time.monotonic() + config.hardware['broadcast_deadline']
+                self.main_window.root.after(20, self._report_signal, signal_id, futures, deadline)
             else:
                 self.hw_status_label.configure(text="Keine Hardware verbunden")
                 
@@ -309,6 +314,24 @@ class PresentationTab:
             self.hw_status_label.configure(text="Fehler beim Senden")
             logger.error(f"Fehler beim Hardware-Signal: {e}")
     
+    def _report_signal(self, signal_id, futures, deadline):
+        """Zählt tatsächlich gesendete Signale, sobald alle Futures erledigt sind"""
+        if not all(future.done() for future in futures) and time.monotonic() < deadline:
+            self.main_window.root.after(20, self._report_signal, signal_id, futures, deadline)
+            return
+        done = [future for future in futures if future.done() and future.exception() is None]
+        sent_count = sum(1 for future in done if future.result() is not None)
+        unchanged = len(done) - sent_count  # vom Zustands-Schatten übersprungen
+        failed = len(futures) - len(done)
+        if done:
+            text = f"Signal gesendet: {signal_id} ({sent_count}/{len(futures)}"
+            text += f", {unchanged} unverändert)" if unchanged else ")"
+            self.hw_status_label.configure(text=text)
+            logger.info(f"Hardware-Signal gesendet: {signal_id} an {sent_count} Ziele, {failed} fehlgeschlagen")
+        else:
+            self.hw_status_label.configure(text=f"Senden fehlgeschlagen: {signal_id}")
+            logger.warning(f"Hardware-Signal {signal_id} an kein Ziel gesendet")
+    
     def refresh_slide_buttons(self):
         """Aktualisiert die Slide-Button-Anzeige"""
         # Einfache Implementierung - in einer echten App würde man die Buttons direkt aktualisieren